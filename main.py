@@ -5,52 +5,128 @@ This is the application entry point for the AI Equity Analyst Agent.
 The main function will initialize the LangGraph workflow and execute the analysis pipeline.
 """
 
+import argparse
+import asyncio
+import logging
+import os
+import uuid
+
 from dotenv import load_dotenv
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+from langgraph.store.sqlite.aio import AsyncSqliteStore
+from langgraph.types import Command
+from src.checkpoint import DeltaCheckpointSaver, make_serde
 from src.graph import build_graph
+from src.nodes.writer import load_report
+from src.runner import checkpoint_db, stream_once
 
 load_dotenv()
 
+# 追蹤輸出走 logging，默認 WARNING 時格式化與 stdout 寫入都會被跳過
+# LOG_LEVEL 只作用於本項目的 logger，避免第三方庫 (aiosqlite 等) 的調試輸出
+logging.basicConfig(level=logging.WARNING, format="%(message)s")
+logging.getLogger("src").setLevel(os.getenv("LOG_LEVEL", "WARNING").upper())
+
+
+def parse_args(argv=None):
+    """Parse CLI arguments."""
+    parser = argparse.ArgumentParser(description="AI Equity Analyst")
+    # 使用真實股票代碼（確保有 10-K 的大公司），例如 TSLA, MSFT, GOOGL
+    parser.add_argument("ticker", nargs="?", default="ABNB", help="Stock ticker symbol (default: ABNB)")
+    parser.add_argument("--thread-id", help="Checkpoint thread id (default: <ticker>-<random>)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue --thread-id from its last checkpoint instead of starting over")
+    args = parser.parse_args(argv)
+    if args.resume and not args.thread_id:
+        parser.error("--resume requires --thread-id")
+    return args
+
 
-def main():
+async def main(argv=None):
     """Main execution function."""
-    print("🚀 啟動 AI Equity Analyst (Sprint 2 - Real Data Miner)...")
-    app = build_graph()
-    config = {"configurable": {"thread_id": "test_sprint2"}}
+    args = parse_args(argv)
+    print("🚀 啟動 AI Equity Analyst...")
+    # Checkpoint 持久化路徑 (SQLite)，可通過 .env 的 CHECKPOINT_DB 覆蓋
+    db = checkpoint_db()
+    async with AsyncSqliteSaver.from_conn_string(db) as saver, \
+            AsyncSqliteStore.from_conn_string(db) as store:
+        # msgpack 編碼 channel_values（不走 pickle），並登記狀態模型
+        saver.serde = make_serde()
+        # 報告正文存於 Store（同一個 SQLite 文件），--resume 時仍可讀取
+        await store.setup()
+        # 只寫入每步變更的 channel，避免大文本在每個 checkpoint 重複序列化
+        app = build_graph(DeltaCheckpointSaver(saver), store)
+        await run(app, args.ticker.upper(), args.thread_id, args.resume)
+
+
+async def collect_input(intr):
+    """
+    Ask the operator to resolve one pending interrupt.
+    
+    Returns:
+        str | None: Text to inject, or None if the operator declined
+    """
+    payload = intr.value or {}
+    print(f"\n🛑 需要人工介入！ ({payload.get('ticker')}: {payload.get('error')})")
+    # 在線程中等待輸入，不阻塞 event loop (checkpoint 寫入等可繼續進行)
+    choice = await asyncio.to_thread(input, ">> 輸入 'y' 模擬上傳數據: ")
+    return "User Provided Data" if choice == 'y' else None
+
+
+async def resume_from_checkpoint(app, config):
+    """
+    Pick up an existing thread from its latest checkpoint instead of re-running it.
     
-    # 使用真實股票代碼進行測試（確保有 10-K 的大公司）
-    ticker = "ABNB"  # 可以改為 TSLA, MSFT, GOOGL 等
-    print(f"\n📊 開始分析流程 - Ticker: {ticker}...")
-    for event in app.stream({"ticker": ticker}, config=config):
-        for node_name, node_output in event.items():
-            print(f"   ✓ {node_name} 完成")
+    Returns:
+        tuple | None: Same shape as stream_once(), or None if the thread has no checkpoint
+    """
+    snapshot = await app.aget_state(config)
+    if not snapshot.values:
+        return None
+    if snapshot.interrupts:
+        # 仍在等待人工介入
+        return snapshot.interrupts, None
+    if snapshot.next:
+        # 上次運行中途退出：從最後一個 checkpoint 繼續，已完成的節點不會重跑
+        return await stream_once(app, None, config)
+    # 已完成：直接讀取報告引用，無需重跑 writer
+    return (), snapshot.values.get("report_ref")
+
+
+async def run(app, ticker, thread_id=None, resume=False):
+    """Drive one analysis session against a compiled graph."""
+    # Checkpoint 持久化於磁盤，默認每次運行使用獨立 thread 避免讀到舊狀態
+    thread_id = thread_id or f"{ticker}-{uuid.uuid4().hex[:8]}"
+    config = {"configurable": {"thread_id": thread_id}}
+    if resume:
+        print(f"\n♻️  從 checkpoint 恢復 (Thread: {thread_id})...")
+        result = await resume_from_checkpoint(app, config)
+        if result is None:
+            print(f"❌ 找不到 thread: {thread_id}")
+            return
+        interrupts, report_ref = result
+    else:
+        print(f"\n📊 開始分析流程 - Ticker: {ticker} (Thread: {thread_id})...")
+        interrupts, report_ref = await stream_once(app, {"ticker": ticker}, config)
     
-    # 檢查暫停
-    snapshot = app.get_state(config)
-    if snapshot.next and snapshot.next[0] == "human_help":
-        print("\n🛑 需要人工介入！")
-        choice = input(">> 輸入 'y' 模擬上傳數據: ")
+    while interrupts:
+        responses = {}
+        for intr in interrupts:
+            value = await collect_input(intr)
+            if value is None:
+                print("❌ 未提供數據，流程終止")
+                return
+            responses[intr.id] = value
         
-        if choice == 'y':
-            print("📤 注入數據...")
-            app.update_state(config, {
-                "sec_text_chunk": "User Provided Data",
-                "error": None
-            })
-            
-            print("▶️ 恢復運行...")
-            for event in app.stream(None, config=config):
-                for node_name, node_output in event.items():
-                    print(f"   ✓ {node_name} 完成")
-                    if "writer" in event:
-                        print(f"\n📄 最終報告:\n{event['writer']['final_report']}")
-        else:
-            print("❌ 未提供數據，流程終止")
-    else:
-        # 如果沒有中斷，直接顯示最終報告
-        final_state = app.get_state(config)
-        if final_state.values.get("final_report"):
-            print(f"\n📄 最終報告:\n{final_state.values['final_report']}")
+        # 單個中斷（常見情況）直接傳值；多個中斷按 interrupt id 一次性恢復，只產生一次 checkpoint
+        resume = value if len(interrupts) == 1 else responses
+        print("📤 注入數據並恢復運行...")
+        interrupts, report_ref = await stream_once(app, Command(resume=resume), config)
+    
+    final_report = await load_report(app.store, thread_id, report_ref)
+    if final_report:
+        print(f"\n📄 最終報告:\n{final_report}")
 
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
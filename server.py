@@ -0,0 +1,171 @@
+"""
+AI Equity Analyst - HTTP Server (optional)
+
+Serves the same LangGraph workflow as main.py over HTTP, so a human-in-the-loop
+pause no longer blocks a worker process on `input()`. One server process can
+hold many paused threads; state lives in the checkpoint DB.
+
+Endpoints:
+    POST /runs                 Start an analysis, returns its thread_id
+    GET  /runs/{thread_id}     Long-poll (up to POLL_TIMEOUT s) until the run pauses or finishes
+    POST /resume/{thread_id}   Inject data for the pending interrupt and continue
+
+Run with: uvicorn server:api
+"""
+
+import asyncio
+import functools
+import uuid
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from dotenv import load_dotenv
+from fastapi import FastAPI, HTTPException
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+from langgraph.store.sqlite.aio import AsyncSqliteStore
+from langgraph.types import Command
+from pydantic import BaseModel
+
+from src.checkpoint import DeltaCheckpointSaver, make_serde
+from src.graph import build_graph
+from src.nodes.writer import load_report
+from src.runner import checkpoint_db, stream_once
+
+# API keys / CHECKPOINT_DB 來自 .env；日誌配置交給 uvicorn (--log-config / --log-level)
+load_dotenv()
+
+# 長輪詢最長等待時間 (秒)
+POLL_TIMEOUT = 30.0
+
+
+class RunRequest(BaseModel):
+    ticker: str = "ABNB"
+    thread_id: Optional[str] = None
+
+
+class ResumeRequest(BaseModel):
+    sec_text: str
+
+
+@asynccontextmanager
+async def lifespan(api: FastAPI):
+    db = checkpoint_db()
+    async with AsyncSqliteSaver.from_conn_string(db) as saver, \
+            AsyncSqliteStore.from_conn_string(db) as store:
+        saver.serde = make_serde()
+        await store.setup()
+        api.state.graph = build_graph(DeltaCheckpointSaver(saver), store)
+        # thread_id -> 正在後台運行的 stream task (結束後由回調移除)
+        api.state.tasks = {}
+        # thread_id -> 最近一次運行的異常 (只保留最後一個，新運行開始時清除)
+        api.state.errors = {}
+        yield
+
+
+api = FastAPI(title="AI Equity Analyst", lifespan=lifespan)
+
+
+def _config(thread_id: str) -> dict:
+    return {"configurable": {"thread_id": thread_id}}
+
+
+def _start(thread_id: str, graph_input) -> None:
+    """Run the graph in the background until it pauses or finishes."""
+    api.state.errors.pop(thread_id, None)
+    task = asyncio.create_task(stream_once(api.state.graph, graph_input, _config(thread_id)))
+    api.state.tasks[thread_id] = task
+    task.add_done_callback(functools.partial(_finish, thread_id))
+
+
+def _finish(thread_id: str, task: asyncio.Task) -> None:
+    """Drop a finished task; keep only its exception (if any) for _status to report."""
+    if api.state.tasks.get(thread_id) is task:
+        del api.state.tasks[thread_id]
+    if not task.cancelled() and task.exception() is not None:
+        api.state.errors[thread_id] = task.exception()
+
+
+def _failure(thread_id: str) -> Optional[BaseException]:
+    """Exception of the thread's last run (None if it succeeded, was cancelled or is still running)."""
+    task = api.state.tasks.get(thread_id)
+    if task is not None and task.done() and not task.cancelled():
+        return task.exception()
+    return api.state.errors.get(thread_id)
+
+
+def _running(thread_id: str) -> Optional[asyncio.Task]:
+    task = api.state.tasks.get(thread_id)
+    return task if task is not None and not task.done() else None
+
+
+async def _status(thread_id: str) -> dict:
+    """Read the run status straight from the checkpoint (survives server restarts)."""
+    error = _failure(thread_id)
+    if error is not None:
+        raise HTTPException(status_code=500, detail=repr(error))
+
+    snapshot = await api.state.graph.aget_state(_config(thread_id))
+    if not snapshot.values:
+        raise HTTPException(status_code=404, detail=f"Unknown thread: {thread_id}")
+    if snapshot.interrupts:
+        return {
+            "thread_id": thread_id,
+            "status": "interrupted",
+            "interrupts": [{"id": i.id, "value": i.value} for i in snapshot.interrupts],
+        }
+    if snapshot.next:
+        return {"thread_id": thread_id, "status": "running"}
+    return {
+        "thread_id": thread_id,
+        "status": "done",
+        "final_report": await load_report(
+            api.state.graph.store, thread_id, snapshot.values.get("report_ref")
+        ),
+    }
+
+
+@api.post("/runs")
+async def create_run(req: RunRequest) -> dict:
+    ticker = req.ticker.upper()
+    thread_id = req.thread_id or f"{ticker}-{uuid.uuid4().hex[:8]}"
+    if _running(thread_id):
+        raise HTTPException(status_code=409, detail=f"Thread already running: {thread_id}")
+    _start(thread_id, {"ticker": ticker})
+    return {"thread_id": thread_id, "status": "running"}
+
+
+@api.get("/runs/{thread_id}")
+async def get_run(thread_id: str) -> dict:
+    task = _running(thread_id)
+    if task is not None:
+        # 長輪詢：等待本輪 stream 結束（暫停或完成），超時則返回 running
+        try:
+            await asyncio.wait_for(asyncio.shield(task), POLL_TIMEOUT)
+        except asyncio.TimeoutError:
+            return {"thread_id": thread_id, "status": "running"}
+        except asyncio.CancelledError:
+            if not task.cancelled():
+                raise  # 本請求自身被取消 (客戶端斷開)
+        except Exception:
+            pass  # 交由 _status 統一報告
+    return await _status(thread_id)
+
+
+@api.post("/resume/{thread_id}")
+async def resume_run(thread_id: str, req: ResumeRequest) -> dict:
+    if _running(thread_id):
+        raise HTTPException(status_code=409, detail=f"Thread still running: {thread_id}")
+    snapshot = await api.state.graph.aget_state(_config(thread_id))
+    if not snapshot.interrupts:
+        raise HTTPException(status_code=409, detail=f"No pending interrupt: {thread_id}")
+
+    # aget_state 期間可能有另一個 resume 請求已啟動：_start 之前再檢查一次
+    # (兩者之間沒有 await，檢查與登記 task 不會被其它請求插入)
+    if _running(thread_id):
+        raise HTTPException(status_code=409, detail=f"Thread still running: {thread_id}")
+
+    # 與 CLI 一致：單個中斷直接傳值，多個中斷按 interrupt id 恢復
+    interrupts = snapshot.interrupts
+    resume = req.sec_text if len(interrupts) == 1 else {i.id: req.sec_text for i in interrupts}
+    _start(thread_id, Command(resume=resume))
+    return {"thread_id": thread_id, "status": "running"}
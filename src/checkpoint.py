@@ -0,0 +1,211 @@
+"""
+Checkpoint Persistence Helpers
+
+This module wraps LangGraph checkpoint savers so that each super-step only
+persists the channels that actually changed (delta checkpoints).
+
+Why: savers such as SqliteSaver serialize the full `channel_values` dict on
+every `put()`. Large, rarely-changing channels (e.g. the 80K-char
+`sec_text_chunk`) would otherwise be rewritten at every node boundary.
+
+`make_serde()` builds the serializer used for checkpoint blobs: compact
+msgpack with no pickle fallback, and our Pydantic state models allowlisted.
+"""
+
+from typing import Any, AsyncIterator, Iterable, Iterator, Optional, Sequence
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+)
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from src.models.analysis import QualitativeAnalysis
+from src.models.financial import FinancialStatements
+from src.models.valuation import ValuationMetrics
+
+# 記錄「沿用父 checkpoint」的 channel 名稱，讀取時據此回溯補齊
+_INHERITED_KEY = "inherited_channels"
+
+# 小而關鍵的控制信號：每個 checkpoint 都完整寫入，無需回溯即可讀取
+DEFAULT_PINNED_CHANNELS = ("ticker", "error")
+
+# AgentState 中會被序列化的 Pydantic 模型
+STATE_MODELS = (FinancialStatements, ValuationMetrics, QualitativeAnalysis)
+
+
+def make_serde() -> JsonPlusSerializer:
+    """
+    Build the checkpoint serializer.
+
+    Channel values are encoded as msgpack (ormsgpack). Pickle fallback stays
+    off so an unsupported value fails loudly instead of silently writing a
+    large pickle blob, and the state models are allowlisted so they decode
+    without the per-load "unregistered type" warning.
+    """
+    return JsonPlusSerializer(
+        pickle_fallback=False,
+        allowed_msgpack_modules=[(m.__module__, m.__name__) for m in STATE_MODELS],
+    )
+
+
+class DeltaCheckpointSaver(BaseCheckpointSaver):
+    """
+    Delta-writing wrapper around any BaseCheckpointSaver.
+
+    Tiers:
+    - Pinned channels (`pinned`): always written in full.
+    - All other channels: written only on the super-step that changed them
+      (i.e. when their version appears in `new_versions`).
+
+    Reads reconstruct the full state by walking `parent_config` until every
+    inherited channel has been found.
+    """
+
+    def __init__(self, inner: BaseCheckpointSaver, pinned: Iterable[str] = DEFAULT_PINNED_CHANNELS):
+        super().__init__(serde=inner.serde)
+        self.inner = inner
+        self.pinned = frozenset(pinned)
+
+    # --- Write path ---
+
+    def _strip(self, checkpoint: Checkpoint, new_versions: ChannelVersions) -> Checkpoint:
+        values = checkpoint["channel_values"]
+        delta = {k: v for k, v in values.items() if k in new_versions or k in self.pinned}
+        inherited = [k for k in values if k not in delta]
+        return {**checkpoint, "channel_values": delta, _INHERITED_KEY: inherited}
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return self.inner.put(config, self._strip(checkpoint, new_versions), metadata, new_versions)
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return await self.inner.aput(config, self._strip(checkpoint, new_versions), metadata, new_versions)
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        self.inner.put_writes(config, writes, task_id, task_path)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        await self.inner.aput_writes(config, writes, task_id, task_path)
+
+    # --- Read path ---
+
+    @staticmethod
+    def _missing(tup: CheckpointTuple) -> tuple[dict, set]:
+        checkpoint = tup.checkpoint
+        values = dict(checkpoint["channel_values"])
+        return values, set(checkpoint.get(_INHERITED_KEY, ())) - values.keys()
+
+    @staticmethod
+    def _merge(values: dict, missing: set, parent: CheckpointTuple) -> None:
+        parent_values = parent.checkpoint["channel_values"]
+        for k in missing & parent_values.keys():
+            values[k] = parent_values[k]
+        missing -= parent_values.keys()
+
+    @staticmethod
+    def _restored(tup: CheckpointTuple, values: dict) -> CheckpointTuple:
+        checkpoint = {k: v for k, v in tup.checkpoint.items() if k != _INHERITED_KEY}
+        checkpoint["channel_values"] = values
+        return tup._replace(checkpoint=checkpoint)
+
+    def _restore(self, tup: Optional[CheckpointTuple]) -> Optional[CheckpointTuple]:
+        if tup is None:
+            return None
+        values, missing = self._missing(tup)
+        parent_config = tup.parent_config
+        while missing and parent_config:
+            parent = self.inner.get_tuple(parent_config)
+            if parent is None:
+                break
+            self._merge(values, missing, parent)
+            parent_config = parent.parent_config
+        return self._restored(tup, values)
+
+    async def _arestore(self, tup: Optional[CheckpointTuple]) -> Optional[CheckpointTuple]:
+        if tup is None:
+            return None
+        values, missing = self._missing(tup)
+        parent_config = tup.parent_config
+        while missing and parent_config:
+            parent = await self.inner.aget_tuple(parent_config)
+            if parent is None:
+                break
+            self._merge(values, missing, parent)
+            parent_config = parent.parent_config
+        return self._restored(tup, values)
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return self._restore(self.inner.get_tuple(config))
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await self._arestore(await self.inner.aget_tuple(config))
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        # 先取完再回溯：部分 saver 在迭代期間持有連接鎖
+        tuples = list(self.inner.list(config, filter=filter, before=before, limit=limit))
+        for tup in tuples:
+            yield self._restore(tup)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        tuples = [tup async for tup in self.inner.alist(config, filter=filter, before=before, limit=limit)]
+        for tup in tuples:
+            yield await self._arestore(tup)
+
+    # --- Delegation ---
+
+    def delete_thread(self, thread_id: str) -> None:
+        self.inner.delete_thread(thread_id)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await self.inner.adelete_thread(thread_id)
+
+    def get_next_version(self, current, channel):
+        return self.inner.get_next_version(current, channel)
+
+    def with_allowlist(self, extra_allowlist):
+        inner = self.inner.with_allowlist(extra_allowlist)
+        if inner is self.inner:
+            return self
+        return DeltaCheckpointSaver(inner, self.pinned)
@@ -5,8 +5,14 @@ This module defines the StateGraph structure, node connections, and routing logi
 for the AI Equity Analyst Agent workflow.
 """
 
+import logging
+from typing import Optional
+
 from langgraph.graph import StateGraph, START, END
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.checkpoint.memory import MemorySaver
+from langgraph.store.base import BaseStore
+from langgraph.store.memory import InMemoryStore
 
 from src.state import AgentState
 from src.nodes.data_miner.node import data_miner_node
@@ -15,6 +21,22 @@ from src.nodes.researcher.node import researcher_node
 from src.nodes.writer.node import writer_node
 from src.nodes.human_node.node import request_human_help_node
 
+# Node keys: plain str constants (LangGraph stores node keys as str),
+# shared by edges, routers and the driver instead of enum/.value lookups
+MINER = "miner"
+HUMAN_HELP = "human_help"
+CALCULATOR = "calculator"
+RESEARCHER = "researcher"
+WRITER = "writer"
+
+logger = logging.getLogger(__name__)
+
+# Router dispatch table: has_error -> (next node, trace label)
+_MINER_ROUTES = {
+    True: (HUMAN_HELP, "Error detected"),
+    False: (CALCULATOR, "Success"),
+}
+
 
 def route_after_miner(state: AgentState) -> str:
     """
@@ -28,44 +50,47 @@ def route_after_miner(state: AgentState) -> str:
     Returns:
         str: Next node name ("human_help" or "calculator")
     """
-    if state.get("error"):
-        print("🔀 [Router] Error detected -> Human Help")
-        return "human_help"
-    print("🔀 [Router] Success -> Calculator")
-    return "calculator"
+    route, label = _MINER_ROUTES[bool(state.get("error"))]
+    logger.debug("🔀 [Router] %s -> %s", label, route)
+    return route
 
 
-def build_graph():
+def build_graph(checkpointer: Optional[BaseCheckpointSaver] = None, store: Optional[BaseStore] = None):
     """
     Build and compile the LangGraph workflow.
     
+    Args:
+        checkpointer: Checkpoint saver for state persistence. Defaults to an
+            in-process MemorySaver; pass a SqliteSaver / PostgresSaver to
+            persist checkpoints on disk and survive restarts.
+        store: Store for large artifacts kept out of the checkpointed state
+            (the writer's report). Defaults to an in-process InMemoryStore.
+    
     Returns:
-        Compiled graph with checkpointer and interrupt support
+        Compiled graph with checkpointer (human_help pauses via interrupt())
     """
     workflow = StateGraph(AgentState)
     
     # Add Nodes
-    workflow.add_node("miner", data_miner_node)
-    workflow.add_node("human_help", request_human_help_node)
-    workflow.add_node("calculator", calculator_node)
-    workflow.add_node("researcher", researcher_node)
-    workflow.add_node("writer", writer_node)
+    workflow.add_node(MINER, data_miner_node)
+    workflow.add_node(HUMAN_HELP, request_human_help_node)
+    workflow.add_node(CALCULATOR, calculator_node)
+    workflow.add_node(RESEARCHER, researcher_node)
+    workflow.add_node(WRITER, writer_node)
     
     # Add Edges
-    workflow.add_edge(START, "miner")
+    workflow.add_edge(START, MINER)
     
     workflow.add_conditional_edges(
-        "miner",
+        MINER,
         route_after_miner,
-        {"human_help": "human_help", "calculator": "calculator"}
+        [route for route, _ in _MINER_ROUTES.values()]
     )
     
-    workflow.add_edge("human_help", "miner")  # Loop Back
-    workflow.add_edge("calculator", "researcher")
-    workflow.add_edge("researcher", "writer")
-    workflow.add_edge("writer", END)
+    workflow.add_edge(HUMAN_HELP, MINER)  # Loop Back
+    workflow.add_edge(CALCULATOR, RESEARCHER)
+    workflow.add_edge(RESEARCHER, WRITER)
+    workflow.add_edge(WRITER, END)
     
-    return workflow.compile(
-        checkpointer=MemorySaver(),
-        interrupt_before=["human_help"]
-    )
+    # human_help 節點內部調用 interrupt() 暫停，無需 interrupt_before
+    return workflow.compile(checkpointer=checkpointer or MemorySaver(), store=store or InMemoryStore())
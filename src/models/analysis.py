@@ -5,13 +5,16 @@ This module defines the Pydantic schema for qualitative analysis results.
 Used by Node C (Researcher) to structure its output.
 """
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List
 
 
 class QualitativeAnalysis(BaseModel):
     """Researcher 節點產出的定性分析結果"""
     
+    # LLM 結構化輸出的邊界仍需 Pydantic 校驗；不可變後節點之間按引用傳遞，無需防禦性拷貝
+    model_config = ConfigDict(frozen=True)
+    
     market_sentiment: str = Field(description="Current market sentiment (Bullish/Bearish/Neutral)")
     key_growth_drivers: List[str] = Field(description="List of key drivers for future growth (e.g., AI, Services)")
     top_risks: List[str] = Field(description="List of major risks mentioned in 10-K or News")
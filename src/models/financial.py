@@ -5,13 +5,16 @@ This module defines the Pydantic schema for financial statements data.
 Originally from Node A (Data Miner), now in the independent models layer.
 """
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional
 
 
 class FinancialStatements(BaseModel):
     """擴充後的財務數據模型 (Domain Model)"""
     
+    # LLM 結構化輸出的邊界仍需 Pydantic 校驗；不可變後節點之間按引用傳遞，無需防禦性拷貝
+    model_config = ConfigDict(frozen=True, extra="ignore", validate_assignment=False)
+    
     fiscal_year: str = Field(description="Fiscal year")
     total_revenue: float = Field(description="Total Revenue in millions")
     net_income: float = Field(description="Net Income in millions")
@@ -5,13 +5,16 @@ This module defines the Pydantic schema for valuation metrics.
 Originally from Node B (Calculator), now in the independent models layer.
 """
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional
 
 
 class ValuationMetrics(BaseModel):
     """Valuation metrics structure (Domain Model)"""
     
+    # 由 Calculator 一次性構造後只讀：不可變、忽略多餘字段、不做賦值校驗
+    model_config = ConfigDict(frozen=True, extra="ignore", validate_assignment=False)
+    
     market_cap: float = Field(description="Market Capitalization in millions")
     current_price: float = Field(description="Current Stock Price")
     
@@ -9,7 +9,7 @@ This module performs pure Python mathematical calculations:
 Note: This node does NOT use LLM to ensure calculation accuracy.
 """
 
-from .node import calculator_node
+from .node import calculator_node, calculator_batch
 
-__all__ = ["calculator_node"]
+__all__ = ["calculator_node", "calculator_batch"]
 
@@ -0,0 +1,41 @@
+"""
+Node B: Calculator - Kernel Pre-compilation
+
+Compiles every `@njit(cache=True)` kernel once with representative float64
+arguments, so numba writes its on-disk cache (`__pycache__/*.nbi|*.nbc`)
+ahead of time. Run it at install / image build time to take JIT warm-up
+off the first valuation:
+
+    python -m src.nodes.calculator._compile
+
+Without numba this is a no-op.
+"""
+
+import time
+
+import numpy as np
+
+from src.nodes.calculator.jit import HAS_NUMBA
+from src.nodes.calculator.logic import _discount_rates_kernel, _growth_rate_kernel
+from src.nodes.calculator.tools import _cagr_kernel, _dcf_multi_kernel, _dcf_track_kernel
+
+
+def compile_kernels() -> float:
+    """Trigger compilation (or cache load) of all calculator kernels; returns seconds taken."""
+    start = time.perf_counter()
+    nan = np.nan
+    _growth_rate_kernel(0.10, 1.5, 25.0, 0.20, 0.0)
+    _discount_rates_kernel(0.042, 1.1, 1e11, 5e9, 1e8, 2e10, 1e11)
+    _dcf_track_kernel(1e9, 0.09, 0.12, nan, 0.025, 10, 5)
+    _cagr_kernel(np.array([1.0, nan, 2.0, 3.0, 4.0]))
+    ones = np.ones(1)
+    _dcf_multi_kernel(ones, ones, ones * 0.09, ones * 0.10, ones * 0.12, np.full(1, nan),
+                      ones, np.zeros(1), 0.025, 10, 5)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    if not HAS_NUMBA:
+        print("numba 未安裝，計算 kernel 以純 Python 運行，無需預編譯")
+    else:
+        print(f"✅ Calculator kernels compiled in {compile_kernels():.1f}s")
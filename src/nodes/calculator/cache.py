@@ -0,0 +1,182 @@
+"""
+Node B: Calculator - Data Cache
+
+Memoizes the yfinance fetchers so repeated calculator runs for the same
+ticker (re-runs, retries after human_help, one process serving many threads)
+do not repeat the network round-trips within a trading day.
+
+Two layers:
+- `daily_cache`: in-process memo, cleared when the date rolls over
+  (optionally with a shorter per-entry TTL).
+- `cached`: on-disk JSON cache under `.cache/<ticker>/`, shared across
+  processes and CLI runs until its TTL expires.
+
+Set CACHE_DISABLED=1 (CI / testing) to bypass both layers.
+"""
+
+import functools
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import date
+
+# 磁盤緩存目錄 (項目根目錄下 .cache/)
+CACHE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../.cache"))
+
+# 各類數據的過期時間：報價 15 分鐘，無風險利率 6h，info / 財報 24h，年報類基本面按季度更新可保留 7 天
+QUOTE_TTL = 15 * 60
+RATE_TTL = 6 * 60 * 60
+DEFAULT_TTL = 24 * 60 * 60
+FUNDAMENTALS_TTL = 7 * 24 * 60 * 60
+
+
+def cache_disabled() -> bool:
+    """True when CACHE_DISABLED is set to a truthy value (read per call)."""
+    return os.getenv("CACHE_DISABLED", "").lower() in ("1", "true", "yes")
+
+
+def daily_cache(func=None, *, ttl: float = None):
+    """
+    Memoize `func(*args)` for the current calendar day.
+
+    The whole memo is dropped when the date rolls over, so quotes refresh
+    daily; pass `ttl` (seconds) to also expire single entries sooner, e.g.
+    `@daily_cache(ttl=QUOTE_TTL)` for live prices. Failed fetches (None) are
+    not cached and will be retried. Concurrent misses for the same args are
+    computed once: later threads wait for the first and reuse its result.
+    The wrapper exposes `cache_clear()` and `cache_put(args, result)`.
+    """
+    if func is None:
+        return functools.partial(daily_cache, ttl=ttl)
+
+    memo = {}  # args -> (result, stored_at)
+    locks = {}  # args -> Lock, so one thread computes each missing entry
+    locks_guard = threading.Lock()
+    day = None
+
+    def roll_day() -> None:
+        nonlocal day
+        today = date.today()
+        if today != day:
+            memo.clear()
+            locks.clear()
+            day = today
+
+    def lookup(args):
+        entry = memo.get(args)
+        if entry is not None and (ttl is None or time.monotonic() - entry[1] < ttl):
+            return entry
+        return None
+
+    @functools.wraps(func)
+    def wrapper(*args):
+        if cache_disabled():
+            return func(*args)
+        roll_day()
+
+        entry = lookup(args)
+        if entry is not None:
+            return entry[0]
+        with locks_guard:
+            lock = locks.setdefault(args, threading.Lock())
+        with lock:
+            # 等鎖期間可能已由其它線程取得
+            entry = lookup(args)
+            if entry is not None:
+                return entry[0]
+            result = func(*args)
+            if result is not None:
+                memo[args] = (result, time.monotonic())
+            return result
+
+    def cache_put(args: tuple, result) -> None:
+        """Seed the memo with a result fetched elsewhere (e.g. a batch download)."""
+        if result is not None and not cache_disabled():
+            roll_day()
+            memo[args] = (result, time.monotonic())
+
+    wrapper.cache_clear = memo.clear
+    wrapper.cache_put = cache_put
+    return wrapper
+
+
+class FileCache:
+    """
+    JSON file cache: `<root>/<ticker>/<endpoint>_<md5(params)>.json`.
+
+    Each file stores `{"timestamp": ..., "data": ...}`; entries older than
+    `ttl` seconds are treated as misses. Writes go through a temp file and
+    `os.replace`, so concurrent runs never read a half-written entry.
+    """
+
+    def __init__(self, root: str = CACHE_DIR, ttl: float = DEFAULT_TTL):
+        self.root = root
+        self.ttl = ttl
+
+    def path(self, ticker: str, endpoint: str, params) -> str:
+        digest = hashlib.md5(json.dumps(params, default=str).encode("utf-8")).hexdigest()
+        return os.path.join(self.root, str(ticker).upper(), f"{endpoint}_{digest}.json")
+
+    def get(self, ticker: str, endpoint: str, params):
+        """Return the cached data, or None on miss / expiry / unreadable file."""
+        try:
+            with open(self.path(ticker, endpoint, params), encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if time.time() - entry.get("timestamp", 0) > self.ttl:
+            return None
+        return entry.get("data")
+
+    def set(self, ticker: str, endpoint: str, params, data) -> None:
+        path = self.path(ticker, endpoint, params)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        except OSError:
+            return  # 緩存目錄不可寫時直接跳過，不影響主流程
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"timestamp": time.time(), "data": data}, f)
+            os.replace(tmp, path)
+        except (OSError, TypeError, ValueError):
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+
+
+def cached(endpoint: str, ttl: float = DEFAULT_TTL, decode=None):
+    """
+    Persist `func(ticker, *params)` results on disk for `ttl` seconds.
+
+    NamedTuple results are stored via `_asdict()`; pass `decode` to rebuild
+    them on a hit. Entries `decode` rejects (e.g. written before a schema
+    change) count as misses and are overwritten. None results are not cached.
+    """
+    store = FileCache(ttl=ttl)
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(ticker, *params):
+            if cache_disabled():
+                return func(ticker, *params)
+            data = store.get(ticker, endpoint, params)
+            if data is not None:
+                if not decode:
+                    return data
+                try:
+                    return decode(data)
+                except (TypeError, ValueError):
+                    pass  # 舊格式 (字段已變更)：按未命中處理，重新取數後覆蓋
+
+            result = func(ticker, *params)
+            if result is not None:
+                store.set(ticker, endpoint, params, result._asdict() if hasattr(result, "_asdict") else result)
+            return result
+
+        wrapper.file_cache = store
+        return wrapper
+
+    return decorator
@@ -0,0 +1,26 @@
+"""
+Node B: Calculator - Optional Numba JIT
+
+Exposes `njit` / `prange` for the calculator's numeric kernels. Numba is an
+optional dependency: when it is not installed, `njit` degrades to an identity
+decorator, `prange` to `range`, and the kernels run as plain Python with
+identical results.
+
+Set NUMBA_DISABLE_JIT=1 to force the pure-Python path for debugging.
+"""
+
+try:
+    from numba import njit, prange
+    HAS_NUMBA = True
+except ImportError:  # numba 未安裝：退化為純 Python
+    HAS_NUMBA = False
+
+    def njit(*args, **kwargs):
+        """Identity stand-in for numba.njit (supports bare and parametrized use)."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+    prange = range
+
+__all__ = ["njit", "prange", "HAS_NUMBA"]
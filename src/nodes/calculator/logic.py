@@ -5,109 +5,188 @@ Responsibilities:
 1. Determine Growth Rates (Hist vs PEG vs SGR).
 2. Calculate Discount Rates (WACC, Ke, Beta Adj).
 3. Determine Exit Multiples (Terminal Value Logic).
-4. Centralize all subjective decision trees.
+4. Select the valuation track per sector (FCF vs EPS).
+5. Centralize all subjective decision trees.
+
+The numeric cores of the growth and discount decisions are `@njit` kernels
+(see jit.py); the public functions are thin wrappers that map None inputs to
+NaN and wrap the results in frozen dataclasses.
 """
 
-import math
+from dataclasses import dataclass
+from functools import lru_cache
 
-def determine_growth_rate(
-    hist_growth: float, 
-    peg_ratio: float, 
-    pe_ratio: float, 
-    roe: float, 
-    payout_ratio: float) -> dict:
+import numpy as np
+
+from src.nodes.calculator.jit import njit
+
+@dataclass(slots=True, frozen=True)
+class GrowthDecision:
+    """Growth rate decision (rate after cap/floor, reason, raw pre-cap rate)."""
+    rate: float
+    source: str
+    raw_rate: float
+
+
+@dataclass(slots=True, frozen=True)
+class DiscountRates:
+    """Discount rate decision (WACC, cost of equity, adjusted beta, interest coverage)."""
+    wacc: float
+    ke: float
+    adj_beta: float
+    int_coverage: float
+
+
+@dataclass(slots=True, frozen=True)
+class ExitMultiple:
+    """Terminal exit multiple decision."""
+    multiple: float
+    reason: str
+
+
+# 增長率來源代碼 -> 說明 (JIT kernel 只返回數字，字符串在 Python 層拼接)
+_GROWTH_SOURCES = (
+    "Default",
+    "Blended (PEG & SGR)",
+    "PEG Implied",
+    "SGR (Hist. Data Weak)",
+    "Blended (SGR & Hist)",
+    "SGR",
+    "Historical CAGR",
+)
+_CAP_MESSAGES = ("", "(Capped 20%)", "(Floored 5%)")
+
+
+def _opt(x) -> float:
+    """None -> NaN sentinel, so the JIT kernels see concrete float64 arguments."""
+    return np.nan if x is None else float(x)
+
+
+@njit(cache=True)
+def _growth_rate_kernel(hist_growth, peg_ratio, pe_ratio, roe, payout_ratio):
     """
-    [Logic] 決定最終使用的增長率。
-    策略：PEG (共識) > SGR (內生) > Historical (歷史)。
+    Numeric core of determine_growth_rate(). Missing inputs are NaN
+    (payout_ratio: 0.0 when absent, NaN only for an invalid value, which disables SGR).
+    
+    Returns:
+        tuple: (final_capped, raw_rate, source_code, cap_code)
     """
     # 1. 計算 SGR
-    sgr = None
-    if roe is not None:
-        retention = 1 - (payout_ratio if payout_ratio else 0.0)
+    has_sgr = False
+    sgr = 0.0
+    if roe == roe and payout_ratio == payout_ratio:
+        retention = 1 - payout_ratio
         calc_sgr = roe * retention
         # Cap SGR for giants like Apple to avoid infinite growth assumptions
         if calc_sgr > 0.20: calc_sgr = 0.20
-        if calc_sgr > 0.02: sgr = calc_sgr
+        if calc_sgr > 0.02:
+            sgr = calc_sgr
+            has_sgr = True
 
     # 2. 計算 PEG Implied
-    peg_growth = None
-    if peg_ratio and peg_ratio > 0 and pe_ratio:
+    has_peg = False
+    peg_growth = 0.0
+    if peg_ratio == peg_ratio and peg_ratio > 0 and pe_ratio == pe_ratio and pe_ratio != 0:
         implied = (pe_ratio / peg_ratio) / 100
-        if 0.02 < implied < 0.30: peg_growth = implied
-        
+        if 0.02 < implied < 0.30:
+            peg_growth = implied
+            has_peg = True
+
+    has_hist = hist_growth == hist_growth and hist_growth != 0
+
     # 3. 決策樹
     final_rate = 0.10
-    source = "Default"
-    
-    if peg_growth:
-        if sgr and peg_growth > sgr * 1.5:
+    source = 0
+
+    if has_peg:
+        if has_sgr and peg_growth > sgr * 1.5:
             final_rate = (peg_growth + sgr) / 2
-            source = "Blended (PEG & SGR)"
+            source = 1
         else:
             final_rate = peg_growth
-            source = "PEG Implied"
-    elif sgr:
-        if hist_growth and hist_growth < 0.05:
+            source = 2
+    elif has_sgr:
+        if has_hist and hist_growth < 0.05:
             final_rate = sgr
-            source = "SGR (Hist. Data Weak)"
-        elif hist_growth:
+            source = 3
+        elif has_hist:
             final_rate = (sgr + hist_growth) / 2
-            source = "Blended (SGR & Hist)"
+            source = 4
         else:
             final_rate = sgr
-            source = "SGR"
-    elif hist_growth:
+            source = 5
+    elif has_hist:
         final_rate = hist_growth
-        source = "Historical CAGR"
-        
-    # 4. Cap & Floor (GuruFocus Rule)
-    final_capped = final_rate
-    msg = ""
-    if final_rate > 0.20: 
-        final_capped = 0.20
-        msg = "(Capped 20%)"
-    elif final_rate < 0.05:
-        final_capped = 0.05
-        msg = "(Floored 5%)"
-        
-    return {
-        "rate": final_capped,
-        "source": f"{source} {msg}",
-        "raw_rate": final_rate
-    }
+        source = 6
 
-def calculate_discount_rates(
-    rf: float, 
-    beta: float, 
-    market_cap: float, 
-    ebit: float, 
-    interest_expense: float,
-    total_debt: float, 
-    market_equity: float) -> dict:
+    # 4. Cap & Floor (GuruFocus Rule) - min/max 編譯為無分支的 minsd/maxsd
+    final_capped = min(0.20, max(0.05, final_rate))
+    cap = 1 if final_rate > 0.20 else (2 if final_rate < 0.05 else 0)
+
+    return final_capped, final_rate, source, cap
+
+
+# 純函數：按精確輸入緩存 (不做四捨五入，避免改變結果)；返回值為不可變 dataclass，可安全共享
+@lru_cache(maxsize=4096)
+def determine_growth_rate(
+    hist_growth: float, 
+    peg_ratio: float, 
+    pe_ratio: float, 
+    roe: float, 
+    payout_ratio: float) -> GrowthDecision:
     """
-    [Logic] 計算 Ke (Cost of Equity) 和 WACC。包含 Beta Adjustment 和 Spread Logic。
+    [Logic] 決定最終使用的增長率。
+    策略：PEG (共識) > SGR (內生) > Historical (歷史)。
+    """
+    # 與原邏輯一致：payout 缺失 (None) 視為全部留存；NaN 則無法計算 SGR
+    payout = 0.0 if payout_ratio is None else float(payout_ratio)
+    rate, raw_rate, source, cap = _growth_rate_kernel(
+        _opt(hist_growth), _opt(peg_ratio), _opt(pe_ratio), _opt(roe), payout
+    )
+    return GrowthDecision(
+        rate=rate,
+        source=f"{_GROWTH_SOURCES[source]} {_CAP_MESSAGES[cap]}",
+        raw_rate=raw_rate
+    )
+
+
+# 折現率假設 (模塊級常量；numba 編譯時作為常量內聯，不在每次調用時重建)
+BLUME_WEIGHT, BLUME_PRIOR = 0.67, 0.33   # Blume's Adjustment: 0.67 * raw beta + 0.33
+MEGA_CAP_BETA_CAP = 1.50                 # 市值 > $200B 的 Beta 上限
+EQUITY_RISK_PREMIUM = 0.06
+HURDLE_PREMIUM = 0.055                   # Ke >= Rf + 5.5%
+TAX_RATE = 0.21
+WACC_FLOOR_PREMIUM = 0.02                # WACC >= Rf + 2%
+
+# 利息覆蓋率分檔 -> 信用利差：[< 2.0x, 2.0x ~ 8.5x, > 8.5x]
+COVERAGE_SPREADS = np.array([0.040, 0.015, 0.010])
+
+
+@njit(cache=True)
+def _discount_rates_kernel(rf, beta, market_cap, ebit, interest_expense, total_debt, market_equity):
+    """
+    Numeric core of calculate_discount_rates().
+    
+    Returns:
+        tuple: (wacc, ke, adj_beta, int_coverage)
     """
     # 1. Adjusted Beta Logic (Blume's + Mega Cap)
     market_cap_b = market_cap / 1e9
-    adj_beta = (0.67 * beta) + 0.33 # Blume's Adjustment
-    if market_cap_b > 200: adj_beta = min(adj_beta, 1.50) # Mega Cap Cap
+    adj_beta = (BLUME_WEIGHT * beta) + BLUME_PRIOR # Blume's Adjustment
+    if market_cap_b > 200: adj_beta = min(adj_beta, MEGA_CAP_BETA_CAP) # Mega Cap Cap
     
     # 2. Cost of Equity (Ke)
-    erp = 0.06 # Equity Risk Premium
-    ke = rf + (adj_beta * erp)
-    ke = max(ke, rf + 0.055) # Hurdle Rate Floor
+    ke = rf + (adj_beta * EQUITY_RISK_PREMIUM)
+    ke = max(ke, rf + HURDLE_PREMIUM) # Hurdle Rate Floor
     
     # 3. Cost of Debt (Kd)
     int_coverage = 100.0
     if interest_expense > 0: int_coverage = ebit / interest_expense
     
-    # Dynamic Spread based on coverage
-    spread = 0.015
-    if int_coverage > 8.5: spread = 0.010
-    elif int_coverage < 2.0: spread = 0.040
+    # Dynamic Spread based on coverage (查表代替 if 鏈；NaN 覆蓋率落在中間檔)
+    spread = COVERAGE_SPREADS[1 - (int_coverage < 2.0) + (int_coverage > 8.5)]
     
     kd = rf + spread
-    tax_rate = 0.21
     
     # 4. WACC
     total_val = market_equity + total_debt
@@ -115,17 +194,55 @@ def calculate_discount_rates(
     if total_val > 0:
         we = market_equity / total_val
         wd = total_debt / total_val
-        wacc = (we * ke) + (wd * kd * (1 - tax_rate))
-        wacc = max(wacc, rf + 0.02) # Floor
+        wacc = (we * ke) + (wd * kd * (1 - TAX_RATE))
+        wacc = max(wacc, rf + WACC_FLOOR_PREMIUM) # Floor
         
-    return {
-        "wacc": wacc,
-        "ke": ke,
-        "adj_beta": adj_beta,
-        "int_coverage": int_coverage
-    }
-
-def determine_exit_multiple(current_pe: float, growth_rate: float, sector: str = "Unknown") -> dict:
+    return wacc, ke, adj_beta, int_coverage
+
+
+def calculate_discount_rates(
+    rf: float, 
+    beta: float, 
+    market_cap: float, 
+    ebit: float, 
+    interest_expense: float,
+    total_debt: float, 
+    market_equity: float) -> DiscountRates:
+    """
+    [Logic] 計算 Ke (Cost of Equity) 和 WACC。包含 Beta Adjustment 和 Spread Logic。
+    """
+    wacc, ke, adj_beta, int_coverage = _discount_rates_kernel(
+        float(rf), float(beta), float(market_cap), float(ebit),
+        float(interest_expense), float(total_debt), float(market_equity)
+    )
+    return DiscountRates(
+        wacc=wacc,
+        ke=ke,
+        adj_beta=adj_beta,
+        int_coverage=int_coverage
+    )
+
+# 行業 -> (cap, floor)。關鍵字按子串匹配 (如 "Banks—Regional")，
+# 每個行業名稱只掃描一次，之後為一次 dict 查找
+_DEFAULT_MULTIPLE_BOUNDS = (25.0, 10.0)
+_SECTOR_MULTIPLE_RULES = (
+    (("bank", "insurance", "energy", "financial"), (15.0, 8.0)),
+    (("technology", "semiconductor"), (28.0, 10.0)),  # 給予科技巨頭稍微高一點的寬容度
+)
+
+
+@lru_cache(maxsize=256)
+def _sector_multiple_bounds(sector: str) -> tuple:
+    """Exit-multiple (cap, floor) for a sector name."""
+    sector_lower = sector.lower()
+    for keywords, bounds in _SECTOR_MULTIPLE_RULES:
+        if any(k in sector_lower for k in keywords):
+            return bounds
+    return _DEFAULT_MULTIPLE_BOUNDS
+
+
+@lru_cache(maxsize=4096)
+def determine_exit_multiple(current_pe: float, growth_rate: float, sector: str = "Unknown") -> ExitMultiple:
     """
     [Logic] 決定 10 年後的退出倍數 (Exit Multiple)。
     策略：
@@ -146,20 +263,42 @@ def determine_exit_multiple(current_pe: float, growth_rate: float, sector: str =
     target_multiple = base_pe * 0.75
 
     # 3. 行業與絕對限制 (Sector Caps & Floors)
-    cap = 25.0
-    floor = 10.0
-    
-    sector_lower = str(sector).lower()
-    if "bank" in sector_lower or "insurance" in sector_lower or "energy" in sector_lower or "financial" in sector_lower:
-        cap = 15.0
-        floor = 8.0
-    elif "technology" in sector_lower or "semiconductor" in sector_lower:
-        cap = 28.0 # 給予科技巨頭稍微高一點的寬容度
+    cap, floor = _sector_multiple_bounds(str(sector))
         
     # 應用限制
     final_multiple = max(floor, min(target_multiple, cap))
     
-    return {
-        "multiple": final_multiple,
-        "reason": f"Current PE {base_pe:.1f}x -> Discounted 25% -> Capped/Floored ({floor}x-{cap}x)"
-    }
\ No newline at end of file
+    return ExitMultiple(
+        multiple=final_multiple,
+        reason=f"Current PE {base_pe:.1f}x -> Discounted 25% -> Capped/Floored ({floor}x-{cap}x)"
+    )
+
+
+# 行業 -> 估值軌道選擇 (每個行業名稱只做一次子串匹配，之後為整數比較)
+VALUATION_BLEND, VALUATION_EPS, VALUATION_FCF = 0, 1, 2
+
+
+@lru_cache(maxsize=256)
+def sector_valuation_kind(sector: str) -> int:
+    """[Logic] 金融/銀行只看 EPS，房地產只看 FCF，其它行業混合。"""
+    if "Financial" in sector or "Bank" in sector: return VALUATION_EPS
+    if "Real Estate" in sector: return VALUATION_FCF
+    return VALUATION_BLEND
+
+
+def select_valuation(v_fcf: float, v_eps: float, kind: int) -> float:
+    """[Logic] 按 sector_valuation_kind() 的結果合併 FCF / EPS 兩條軌道的估值。"""
+    if kind == VALUATION_EPS: return v_eps
+    if kind == VALUATION_FCF: return v_fcf
+    if v_fcf > 0 and v_eps > 0: return (v_fcf + v_eps) / 2
+    return max(v_fcf, v_eps)
+
+
+# 估值狀態規則表：上漲空間落在 ±FAIR_VALUE_BAND 內為合理估值
+FAIR_VALUE_BAND = 0.10
+_VALUATION_STATUSES = ("Overvalued", "Fair Value", "Undervalued")
+
+
+def valuation_status(upside: float) -> str:
+    """[Logic] 按上漲空間 (小數) 查表得出估值狀態；NaN 視為合理估值。"""
+    return _VALUATION_STATUSES[1 + (upside > FAIR_VALUE_BAND) - (upside < -FAIR_VALUE_BAND)]
@@ -8,54 +8,99 @@ Flow:
 4. Presentation Layer: Aggregate Metrics.
 """
 
+import logging
+from dataclasses import dataclass
+from typing import List, Optional, Union
+
 from src.state import AgentState
 from src.models.valuation import ValuationMetrics
-from src.nodes.calculator.tools import get_market_data_raw, get_normalized_income_data, calculate_historical_growth, calculate_dcf
-from src.nodes.calculator.logic import determine_growth_rate, calculate_discount_rates, determine_exit_multiple
+from src.nodes.calculator.tools import fetch_all, fetch_all_batch, calculate_dcf_batched, calculate_dcf_multi
+from src.nodes.calculator.logic import (
+    DiscountRates, ExitMultiple, GrowthDecision,
+    determine_growth_rate, calculate_discount_rates, determine_exit_multiple,
+    sector_valuation_kind, select_valuation, valuation_status,
+)
 
-def calculator_node(state: AgentState) -> dict:
-    ticker = state["ticker"]
-    print(f"\n🧮 [Calculator] Processing {ticker} (Refactored Structure)...")
-    
-    # 1. 數據獲取 (Data Layer)
-    md = get_market_data_raw(ticker)
+# 計算過程追蹤走 logging：默認 WARNING 時格式化與 stdout 寫入都會被跳過
+logger = logging.getLogger(__name__)
+
+# 估值必需的市場字段：缺失 (0/None) 時提前返回錯誤，而不是算出全零的估值
+REQUIRED_MARKET_FIELDS = ("price", "shares_outstanding", "market_cap")
+
+
+@dataclass(slots=True, frozen=True)
+class _ValuationPlan:
+    """Per-ticker DCF inputs (Conservative / Street bases) plus what the result summary needs."""
+    ticker: str
+    price: float
+    market_cap: float
+    shares: float
+    sector: str
+    pe_ratio: Optional[float]
+    sbc: float
+    net_debt: float
+    raw_ni: float
+    ni_m: float
+    rev_m: float
+    earnings_base: float
+    is_normalized: bool
+    base_fcf_cons: float
+    base_eps_cons: float
+    base_fcf_street: float
+    base_eps_street: float
+    growth_dec: GrowthDecision
+    disc_dec: DiscountRates
+    exit_mult_dec: ExitMultiple
+
+
+def _plan_valuation(ticker: str, fin_obj, md, nri_data, hist_growth) -> Union[_ValuationPlan, dict]:
+    """Validate the fetched inputs and make the parameter decisions; returns an error dict on bad data."""
     if not md: return {"error": "Market Data Failed"}
+    missing = [field for field in REQUIRED_MARKET_FIELDS if not getattr(md, field)]
+    if missing: return {"error": f"Market Data Incomplete: {', '.join(missing)}"}
     
-    fin_obj = state.get("financial_data")
-    financials = fin_obj.model_dump()
-    nri_data = get_normalized_income_data(ticker)
-    print(f"📥 [Sector] {md['sector']} | Market Cap: ${md['market_cap']/1e9:.2f}B")
+    # 多處使用的市場字段按名稱綁定為局部變量，其餘直接用 md.<field>
+    price, market_cap, shares = md.price, md.market_cap, md.shares_outstanding
+    sector, pe_ratio, sbc = md.sector, md.pe_ratio, md.sbc
+    
+    # 財報數據 (單位：百萬) 一次性讀出，後續 FCF / EPS / Margin 共用
+    ni_m, rev_m = fin_obj.net_income, fin_obj.total_revenue
+    # capex 由 LLM 從 10-K 提取 (不是 yfinance)，正負號不固定 (見 FinancialStatements)，abs() 統一按流出處理
+    fcf_fy_m = fin_obj.operating_cash_flow - abs(fin_obj.capital_expenditures)
     
     # 2. 核心參數決策 (Logic Layer)
     # A. Growth
-    hist_growth = calculate_historical_growth(ticker)
     growth_dec = determine_growth_rate(
-        hist_growth, md['peg_ratio'], md['pe_ratio'], md['roe'], md['payout_ratio']
+        hist_growth, md.peg_ratio, pe_ratio, md.roe, md.payout_ratio
     )
-    print(f"📊 [Growth] {growth_dec['rate']:.1%} | Reason: {growth_dec['source']}")
     
     # B. Discount
     disc_dec = calculate_discount_rates(
-        md['risk_free_rate'], md['beta'], md['market_cap'], 
-        md['ebit'], md['interest_expense'], md['total_debt'], md['market_cap']
+        md.risk_free_rate, md.beta, market_cap, 
+        md.ebit, md.interest_expense, md.total_debt, market_cap
     )
-    print(f"⚖️ [Discount] WACC: {disc_dec['wacc']:.1%} | Ke: {disc_dec['ke']:.1%}")
     
     # C. Exit Multiple Decision (New)
     exit_mult_dec = determine_exit_multiple(
-        md['pe_ratio'], 
-        growth_dec['rate'], 
-        md['sector']
+        pe_ratio, 
+        growth_dec.rate, 
+        sector
+    )
+    
+    # 決策輸入明細：最嘈雜的部分降為 DEBUG，批量運行時可單獨關閉
+    logger.debug(
+        "🔎 [Sources] Hist: %s | PEG: %s | PE: %s | ROE: %s | Payout: %s -> Raw Growth: %.2f%%\n"
+        "🔎 [Discount Inputs] Rf: %.2f%% | Beta: %s -> Adj: %.2f | Interest Coverage: %.1fx",
+        hist_growth, md.peg_ratio, pe_ratio, md.roe, md.payout_ratio, growth_dec.raw_rate * 100,
+        md.risk_free_rate * 100, md.beta, disc_dec.adj_beta, disc_dec.int_coverage,
     )
-    print(f"🎯 [Exit Multiple] Target: {exit_mult_dec['multiple']:.1f}x | Reason: {exit_mult_dec['reason']}")
     
     # 3. 準備 DCF 輸入 (Scenario Preparation)
-    shares = md['shares_outstanding']
-    net_debt = md['total_debt'] - md['cash_and_equivalents']
+    net_debt = md.total_debt - md.cash_and_equivalents
     
     # Base Values
     # [FIX] Explicitly define raw_ni (GAAP Net Income) first
-    raw_ni = financials['net_income'] * 1_000_000
+    raw_ni = ni_m * 1_000_000
     
     # Use Normalized Income if available for better accuracy, else GAAP Net Income
     earnings_base = 0.0
@@ -66,87 +111,71 @@ def calculator_node(state: AgentState) -> dict:
     else:
         earnings_base = raw_ni
     
-    # FCF (Street): OCF - Capex
-    raw_fcf = (fin_obj.operating_cash_flow - abs(fin_obj.capital_expenditures)) * 1_000_000
-    if md['fcf_ttm'] > 0:
-        raw_fcf = md['fcf_ttm']
-        
-    sbc = md['sbc']
+    # FCF (Street): TTM 優先，否則用財年 OCF - Capex
+    raw_fcf = md.fcf_ttm if md.fcf_ttm > 0 else fcf_fy_m * 1_000_000
     
     # Scenario 1: Conservative (SBC is Cost)
     base_eps_cons = earnings_base # Usually Normalized Income is best proxy for owner earnings base
     base_fcf_cons = raw_fcf - sbc
-    if base_fcf_cons < 0: base_fcf_cons = 0
+    if base_fcf_cons < 0: base_fcf_cons = 0.0
     
     # Scenario 2: Street (SBC is ignored)
     base_eps_street = earnings_base + sbc # Add back SBC to mimic Non-GAAP
     base_fcf_street = raw_fcf
     
-    print(f"🎭 [Scenario] SBC: ${sbc/1e9:.2f}B")
-    
-    # 4. 執行計算 (Calculation Layer)
-    
-    # --- Conservative Scenario ---
-    # Track A: FCF Model
-    res_fcf = calculate_dcf(
-        base_fcf_cons, shares, net_debt, 
-        growth_dec['rate'], disc_dec['wacc'], 
-        exit_multiple=exit_mult_dec['multiple'],
-        method="FCF(Cons)"
-    )
-    
-    # Track B: EPS Model (Net Debt = 0 for Equity Valuation)
-    res_eps = calculate_dcf(
-        base_eps_cons, shares, 0.0, 
-        growth_dec['rate'], disc_dec['ke'], 
-        exit_multiple=exit_mult_dec['multiple'],
-        method="EPS(Cons)"
-    )
-    
-    # --- Street Scenario (Bull Case) ---
-    res_fcf_bull = calculate_dcf(
-        base_fcf_street, shares, net_debt,
-        growth_dec['rate'], disc_dec['wacc'], 
-        exit_multiple=exit_mult_dec['multiple'],
-        method="FCF(Street)"
-    )
-    res_eps_bull = calculate_dcf(
-        base_eps_street, shares, 0.0,
-        growth_dec['rate'], disc_dec['ke'], 
-        exit_multiple=exit_mult_dec['multiple'],
-        method="EPS(Street)"
+    return _ValuationPlan(
+        ticker=ticker, price=price, market_cap=market_cap, shares=shares, sector=sector,
+        pe_ratio=pe_ratio, sbc=sbc, net_debt=net_debt,
+        raw_ni=raw_ni, ni_m=ni_m, rev_m=rev_m,
+        earnings_base=earnings_base, is_normalized=is_normalized,
+        base_fcf_cons=base_fcf_cons, base_eps_cons=base_eps_cons,
+        base_fcf_street=base_fcf_street, base_eps_street=base_eps_street,
+        growth_dec=growth_dec, disc_dec=disc_dec, exit_mult_dec=exit_mult_dec,
     )
+
+
+def _build_result(plan: _ValuationPlan, val_fcf: float, val_eps: float, val_fcf_bull: float, val_eps_bull: float) -> dict:
+    """Combine the four DCF track values into ValuationMetrics (node output)."""
+    price, market_cap, shares = plan.price, plan.market_cap, plan.shares
+    earnings_base = plan.earnings_base
+    growth_dec, disc_dec, exit_mult_dec = plan.growth_dec, plan.disc_dec, plan.exit_mult_dec
     
     # 5. 結果匯總 & 智能決策
     
-    def select_val(v_fcf, v_eps, sect):
-        if "Financial" in sect or "Bank" in sect: return v_eps
-        if "Real Estate" in sect: return v_fcf
-        if v_fcf > 0 and v_eps > 0: return (v_fcf + v_eps) / 2
-        return max(v_fcf, v_eps)
-
-    val_cons = select_val(res_fcf['intrinsic_value'], res_eps['intrinsic_value'], md['sector'])
-    val_bull = select_val(res_fcf_bull['intrinsic_value'], res_eps_bull['intrinsic_value'], md['sector'])
+    valuation_kind = sector_valuation_kind(plan.sector)
+    val_cons = select_valuation(val_fcf, val_eps, valuation_kind)
+    val_bull = select_valuation(val_fcf_bull, val_eps_bull, valuation_kind)
     
-    curr_price = md['price']
-    upside = (val_cons - curr_price) / curr_price if curr_price else 0
+    upside = (val_cons - price) / price if price else 0.0
     
-    print(f"💎 [Result] Conservative: ${val_cons:.2f} (Upside: {upside:.1%}) | Bull: ${val_bull:.2f}")
+    # 決策摘要合併為一條日誌，僅在 INFO 開啟時格式化
+    logger.info(
+        "📥 [Sector] %s | Market Cap: $%.2fB\n"
+        "📊 [Growth] %.1f%% | Reason: %s\n"
+        "⚖️ [Discount] WACC: %.1f%% | Ke: %.1f%%\n"
+        "🎯 [Exit Multiple] Target: %.1fx | Reason: %s\n"
+        "🎭 [Scenario] SBC: $%.2fB\n"
+        "💎 [Result] Conservative: $%.2f (Upside: %.1f%%) | Bull: $%.2f",
+        plan.sector, market_cap / 1e9,
+        growth_dec.rate * 100, growth_dec.source,
+        disc_dec.wacc * 100, disc_dec.ke * 100,
+        exit_mult_dec.multiple, exit_mult_dec.reason,
+        plan.sbc / 1e9,
+        val_cons, upside * 100, val_bull,
+    )
     
     # Populate Metrics
-    pe_ttm = md['pe_ratio'] if md['pe_ratio'] else 0
+    pe_ttm = float(plan.pe_ratio) if plan.pe_ratio else 0.0
     
     # Calculate FY P/E
-    pe_fy = 0
-    if earnings_base > 0 and md['market_cap'] > 0:
-        pe_fy = md['market_cap'] / earnings_base
+    pe_fy = 0.0
+    if earnings_base > 0 and market_cap > 0:
+        pe_fy = market_cap / earnings_base
         
     # Calculate Margin
-    rev_m = financials.get('total_revenue', 0)
-    ni_m = financials.get('net_income', 0)
-    margin = (ni_m / rev_m * 100) if rev_m > 0 else 0
+    margin = (plan.ni_m / plan.rev_m * 100) if plan.rev_m > 0 else 0.0
     
-    eps_norm = earnings_base / shares if shares else 0
+    eps_norm = earnings_base / shares if shares else 0.0
 
     # [Polish] Restore Trend Insight
     trend_insight = "Stable"
@@ -158,24 +187,103 @@ def calculator_node(state: AgentState) -> dict:
             trend_insight = f"Earnings Declining (Forward PE {pe_fy:.1f} > TTM {pe_ttm:.1f})"
 
     metrics_dict = {
-        "market_cap": md['market_cap'] / 1_000_000, 
-        "current_price": curr_price,
+        "market_cap": market_cap / 1_000_000, 
+        "current_price": price,
         "dcf_value": val_cons,
         "dcf_value_bull": val_bull,
         "dcf_upside": round(upside * 100, 2),
-        "valuation_status": "Undervalued" if upside > 0.1 else ("Overvalued" if upside < -0.1 else "Fair Value"),
+        "valuation_status": valuation_status(upside),
         "pe_ratio": pe_ttm,
         "net_profit_margin": round(margin, 2),
         "pe_ratio_ttm": pe_ttm,
         "pe_ratio_fy": round(pe_fy, 2),
         "pe_trend_insight": trend_insight, 
-        "eps_ttm": raw_ni / shares if shares else 0, # GAAP EPS
+        "eps_ttm": plan.raw_ni / shares if shares else 0.0, # GAAP EPS
         "eps_normalized": round(eps_norm, 2),
-        "is_normalized": is_normalized
+        "is_normalized": plan.is_normalized
     }
     
+    # metrics_dict 由本節點構造，字段與類型均由代碼保證符合 ValuationMetrics schema，
+    # 因此使用 model_construct() 跳過 Pydantic 校驗 (外部輸入仍應走 model_validate)
     return {
-        "valuation_metrics": ValuationMetrics(**metrics_dict),
+        "valuation_metrics": ValuationMetrics.model_construct(**metrics_dict),
         "investigation_tasks": [],
         "error": None
-    }
\ No newline at end of file
+    }
+
+
+def calculator_node(state: AgentState) -> dict:
+    ticker = state["ticker"]
+    logger.info("🧮 [Calculator] Processing %s (Refactored Structure)...", ticker)
+    
+    # 直接讀取 Pydantic 屬性，無需 model_dump() 複製整個模型；無財報時無需發起任何網絡請求
+    fin_obj = state.get("financial_data")
+    if fin_obj is None: return {"error": "Financial Data Missing"}
+    
+    # 1. 數據獲取 (Data Layer) + 2./3. 參數決策與情景準備
+    plan = _plan_valuation(ticker, fin_obj, *fetch_all(ticker))
+    if isinstance(plan, dict): return plan
+    
+    # 4. 執行計算 (Calculation Layer)
+    # 四條軌道共享增長路徑與退出倍數，一次向量化計算：
+    #   Conservative (SBC is Cost): FCF/WACC, EPS/Ke
+    #   Street (Bull Case):         FCF/WACC, EPS/Ke
+    # EPS Model 使用 Net Debt = 0 (Equity Valuation)
+    wacc, ke = plan.disc_dec.wacc, plan.disc_dec.ke
+    values = calculate_dcf_batched(
+        [plan.base_fcf_cons, plan.base_eps_cons, plan.base_fcf_street, plan.base_eps_street],
+        plan.shares,
+        [plan.net_debt, 0.0, plan.net_debt, 0.0],
+        plan.growth_dec.rate,
+        [wacc, ke, wacc, ke],
+        exit_multiple=plan.exit_mult_dec.multiple,
+    ).tolist()
+    
+    return _build_result(plan, *values)
+
+
+def calculator_batch(states: List[AgentState]) -> List[dict]:
+    """
+    批量運行計算節點 (Watchlist / Portfolio 模式)，每個 state 對應一隻股票。
+    
+    Inputs for all tickers are fetched in parallel threads, then every
+    ticker's Conservative and Street scenarios are valued in a single
+    calculate_dcf_multi() kernel call (2 rows per ticker). Per-ticker
+    results match calculator_node().
+    
+    Returns:
+        list: calculator_node-style outputs, in the order of `states`
+    """
+    fetched = fetch_all_batch([state["ticker"] for state in states])
+    
+    results = [None] * len(states)
+    plans = []  # (index in states, plan)
+    for i, state in enumerate(states):
+        fin_obj = state.get("financial_data")
+        if fin_obj is None:
+            results[i] = {"error": "Financial Data Missing"}
+            continue
+        plan = _plan_valuation(state["ticker"], fin_obj, *fetched[state["ticker"]])
+        if isinstance(plan, dict):
+            results[i] = plan
+        else:
+            plans.append((i, plan))
+    
+    if plans:
+        # 行 0..m-1 為 Conservative 情景，行 m..2m-1 為 Street 情景
+        both = [p for _, p in plans] * 2
+        m = len(plans)
+        values = calculate_dcf_multi(
+            [p.base_fcf_cons for _, p in plans] + [p.base_fcf_street for _, p in plans],
+            [p.base_eps_cons for _, p in plans] + [p.base_eps_street for _, p in plans],
+            [p.disc_dec.wacc for p in both],
+            [p.disc_dec.ke for p in both],
+            [p.growth_dec.rate for p in both],
+            [p.shares for p in both],
+            [p.net_debt for p in both],
+            exit_multiples=[p.exit_mult_dec.multiple for p in both],
+        ).tolist()
+        for k, (i, plan) in enumerate(plans):
+            (val_fcf, val_eps), (val_fcf_bull, val_eps_bull) = values[k], values[m + k]
+            results[i] = _build_result(plan, val_fcf, val_eps, val_fcf_bull, val_eps_bull)
+    return results
@@ -7,25 +7,230 @@ Responsibilities:
 3. Perform pure mathematical projections (DCF core).
 """
 
-import yfinance as yf
-import pandas as pd
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional
+
 import numpy as np
 
-def get_market_data_raw(ticker: str):
+from src.nodes.calculator.cache import (
+    FUNDAMENTALS_TTL, QUOTE_TTL, RATE_TTL, cache_disabled, cached, daily_cache,
+)
+from src.nodes.calculator.jit import njit, prange
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "MarketData", "DEFAULT_RISK_FREE_RATE",
+    "get_market_data_raw", "get_normalized_income_data", "calculate_historical_growth",
+    "prefetch_quotes", "fetch_all", "fetch_all_batch",
+    "calculate_dcf_batched", "calculate_dcf_grid", "calculate_dcf_multi",
+]
+
+# yfinance (連帶 pandas) 導入耗時約 0.3s，延遲到第一次取數時再加載
+_yf = None
+
+
+def _yfinance():
+    """Import yfinance on first use and keep the module reference."""
+    global _yf
+    if _yf is None:
+        import yfinance
+        _yf = yfinance
+    return _yf
+
+
+@daily_cache
+def _ticker(symbol: str):
+    """
+    One yf.Ticker per symbol per day: the fetchers share its internal
+    caches (info, statements) instead of each building a fresh object.
+    """
+    return _yfinance().Ticker(symbol)
+
+
+@daily_cache
+def _financials(symbol: str):
+    """
+    Income statement, fetched once per symbol per day. get_market_data_raw,
+    get_normalized_income_data and calculate_historical_growth run in parallel
+    in fetch_all and all read it; yfinance's own statement memo has no lock,
+    so each of them would otherwise download it.
+    """
+    return _ticker(symbol).financials
+
+
+# MarketData 用到的 info 字段：只保留這幾個鍵，不持有完整的 info 大字典
+_INFO_KEYS = (
+    "sharesOutstanding", "marketCap", "sector", "beta", "trailingPE",
+    "pegRatio", "freeCashflow", "returnOnEquity", "payoutRatio",
+)
+
+
+# marketCap / trailingPE / pegRatio 隨股價變動，與報價同樣只保留 QUOTE_TTL
+@daily_cache(ttl=QUOTE_TTL)
+def _info(symbol: str) -> dict:
+    """
+    The `Ticker.info` keys the fetchers need, refreshed every QUOTE_TTL.
+    yfinance keeps `.info` on the Ticker for its lifetime, so this reads it
+    from a fresh Ticker rather than the day-long shared one.
+    """
+    info = _yfinance().Ticker(symbol).info or {}
+    return {key: info[key] for key in _INFO_KEYS if key in info}
+
+
+@daily_cache(ttl=QUOTE_TTL)
+def _last_close(symbol: str) -> Optional[float]:
+    """Latest close (5-day window to handle weekends/holidays); None if no quotes."""
+    hist = _ticker(symbol).history(period="5d")
+    if hist.empty: return None
+    return float(hist["Close"].values[-1])
+
+
+# 10 年期國債收益率對所有股票相同：整個進程共享一份，RATE_TTL 內不重複請求
+DEFAULT_RISK_FREE_RATE = 0.042
+_rf_lock = threading.Lock()
+_rf_memo = None  # (stored_at, rate)
+
+
+def _risk_free_rate() -> float:
+    """
+    Risk-free rate from ^TNX (percent -> decimal), memoized for RATE_TTL.
+    The lock makes concurrent fetchers wait for one request instead of each
+    sending their own; failures fall back to DEFAULT_RISK_FREE_RATE and are retried.
+    """
+    global _rf_memo
+    with _rf_lock:
+        if _rf_memo is not None and not cache_disabled() and time.monotonic() - _rf_memo[0] < RATE_TTL:
+            return _rf_memo[1]
+        try:
+            tnx = _last_close("^TNX")
+        except Exception:
+            tnx = None
+        if tnx is None:
+            return DEFAULT_RISK_FREE_RATE
+        _rf_memo = (time.monotonic(), tnx / 100)
+        return _rf_memo[1]
+
+
+def prefetch_quotes(symbols: List[str]) -> None:
+    """
+    [Fetcher] 批量下載收盤價：一次 yf.download 請求覆蓋所有股票 (及 ^TNX)，
+    結果寫入 _last_close 的緩存，之後逐股取數不再單獨請求報價。
+    下載失敗時不做處理，各股票回退到單獨請求。
+    """
+    symbols = list(dict.fromkeys(symbols))
+    if not symbols:
+        return
+    try:
+        df = _yfinance().download(
+            " ".join(symbols), period="5d", group_by="ticker", threads=True, progress=False
+        )
+    except Exception as e:
+        logger.warning("⚠️ [Data Fetcher] Batch quote download failed: %s", e)
+        return
+    if df is None or df.empty:
+        return
+    
+    multi = df.columns.nlevels > 1
+    for symbol in symbols:
+        if multi and symbol not in df.columns.get_level_values(0):
+            continue
+        closes = (df[symbol] if multi else df)["Close"].dropna()
+        if not closes.empty:
+            _last_close.cache_put((symbol,), float(closes.values[-1]))
+
+
+# 報表字段的候選 key (按優先順序)，yfinance 不同版本 / 公司的行名不一致
+_DEBT_KEYS = ["Total Debt"]
+_CASH_KEYS = ["Cash And Cash Equivalents"]
+_EBIT_KEYS = ["EBIT", "Operating Income"]
+_INTEREST_KEYS = ["Interest Expense", "Interest Expense Non Operating"]
+_SBC_KEYS = ["Stock Based Compensation", "Share Based Compensation", "Issuance Of Stock"]
+
+
+def _latest_values(stmt, labels: List[str]) -> dict:
+    """
+    Latest-period (first column) values for `labels`, located with a single
+    `get_indexer` call; missing or NaN rows are left out of the result.
+    """
+    if stmt.empty:
+        return {}
+    if not stmt.index.is_unique:
+        stmt = stmt[~stmt.index.duplicated()]
+    latest = stmt.iloc[:, 0].to_numpy()
+    values = {}
+    for label, pos in zip(labels, stmt.index.get_indexer(labels)):
+        if pos != -1 and latest[pos] is not None:
+            val = float(latest[pos])
+            if val == val:  # 跳過 NaN
+                values[label] = val
+    return values
+
+
+def _latest_value(stmt, label: str):
+    """Latest-period (first column) value of one row, read by position (`.iat`)."""
+    return stmt.iat[stmt.index.get_loc(label), 0]
+
+
+def _first_value(values: dict, keys: List[str], default: float = 0.0) -> float:
+    """First of `keys` present in `values` (priority order), or `default`."""
+    return next((values[key] for key in keys if key in values), default)
+
+
+class MarketData(NamedTuple):
+    """Raw market snapshot for one ticker (fixed fields, attribute access)."""
+    price: float
+    market_cap: float
+    shares_outstanding: float
+    sector: str
+    beta: Optional[float]
+    pe_ratio: Optional[float]
+    peg_ratio: Optional[float]
+    risk_free_rate: float
+    total_debt: float
+    cash_and_equivalents: float
+    ebit: float
+    interest_expense: float
+    sbc: float
+    fcf_ttm: float
+    roe: Optional[float]
+    payout_ratio: Optional[float]
+    fcf_data_source: str
+
+
+# 快照包含最新收盤價，內存與磁盤緩存都只保留 QUOTE_TTL
+@daily_cache(ttl=QUOTE_TTL)
+@cached("market_data", ttl=QUOTE_TTL, decode=lambda d: MarketData(**d))
+def get_market_data_raw(ticker: str) -> Optional[MarketData]:
     """
     [Fetcher] 只負責從 yfinance 搬運原始數據，不做主觀判斷。
     """
     try:
-        stock = yf.Ticker(ticker)
-        # Fetch 5 days to handle weekends/holidays
-        hist = stock.history(period="5d")
-        if hist.empty: return None
+        stock = _ticker(ticker)
+        # 六個端點互相獨立，並行請求：耗時由各請求之和降為最慢的一個
+        # 報價走 _last_close (可能已由 prefetch_quotes 批量預取)
+        calls = {
+            "price": lambda: _last_close(ticker),
+            "info": lambda: _info(ticker),
+            "bs": lambda: stock.balance_sheet,
+            "is": lambda: _financials(ticker),
+            "cf": lambda: stock.cashflow,
+            "rf": _risk_free_rate,
+        }
+        with ThreadPoolExecutor(max_workers=len(calls)) as ex:
+            futures = {name: ex.submit(call) for name, call in calls.items()}
+        
+        current_price = futures["price"].result()
+        if current_price is None: return None
         
-        current_price = float(hist["Close"].iloc[-1])
-        info = stock.info
-        bs = stock.balance_sheet
-        is_stmt = stock.financials
-        cf = stock.cashflow
+        info = futures["info"].result()
+        bs = futures["bs"].result()
+        is_stmt = futures["is"].result()
+        cf = futures["cf"].result()
         
         # 基礎數據提取
         shares = info.get("sharesOutstanding")
@@ -33,185 +238,401 @@ def get_market_data_raw(ticker: str):
         if not shares and market_cap: shares = market_cap / current_price
         if not market_cap and shares: market_cap = current_price * shares
         
-        # 提取財務報表最新日期
-        bs_date = bs.columns[0] if not bs.empty else None
-        is_date = is_stmt.columns[0] if not is_stmt.empty else None
-        cf_date = cf.columns[0] if not cf.empty else None
+        # 提取原始數值 (Raw Values)：每張報表一次 get_indexer 取出全部候選行，
+        # 每個字段再按候選 key 的優先順序取第一個有效值
+        bs_vals = _latest_values(bs, _DEBT_KEYS + _CASH_KEYS)
+        is_vals = _latest_values(is_stmt, _EBIT_KEYS + _INTEREST_KEYS)
+        cf_vals = _latest_values(cf, _SBC_KEYS)
 
-        # 提取原始數值 (Raw Values)
         # 1. Debt & Cash
-        total_debt = 0.0
-        cash_eq = 0.0
-        if bs_date:
-            total_debt = float(bs.loc['Total Debt', bs_date]) if 'Total Debt' in bs.index else 0.0
-            cash_eq = float(bs.loc['Cash And Cash Equivalents', bs_date]) if 'Cash And Cash Equivalents' in bs.index else 0.0
+        total_debt = _first_value(bs_vals, _DEBT_KEYS)
+        cash_eq = _first_value(bs_vals, _CASH_KEYS)
             
         # 2. EBIT & Interest (For Coverage)
-        ebit = 0.0
-        interest_expense = 0.0
-        if is_date:
-            if 'EBIT' in is_stmt.index: ebit = float(is_stmt.loc['EBIT', is_date])
-            elif 'Operating Income' in is_stmt.index: ebit = float(is_stmt.loc['Operating Income', is_date])
-            
-            if 'Interest Expense' in is_stmt.index: 
-                interest_expense = abs(float(is_stmt.loc['Interest Expense', is_date]))
-            elif 'Interest Expense Non Operating' in is_stmt.index:
-                interest_expense = abs(float(is_stmt.loc['Interest Expense Non Operating', is_date]))
+        ebit = _first_value(is_vals, _EBIT_KEYS)
+        interest_expense = abs(_first_value(is_vals, _INTEREST_KEYS))
 
         # 3. SBC & FCF
-        sbc = 0.0
+        sbc = abs(_first_value(cf_vals, _SBC_KEYS))
         fcf_ttm = info.get("freeCashflow")
-        if cf_date:
-            # 嘗試提取 SBC
-            for key in ['Stock Based Compensation', 'Share Based Compensation', 'Issuance Of Stock']:
-                if key in cf.index:
-                    val = cf.loc[key, cf_date]
-                    if val is not None: sbc = abs(float(val))
-                    break
         
-        # 4. Risk Free Rate (Robust)
-        rf = 0.042 # Default
-        try:
-            tnx = yf.Ticker("^TNX").history(period="5d")
-            if not tnx.empty: rf = float(tnx["Close"].iloc[-1]) / 100
-        except: pass
+        # 4. Risk Free Rate (進程內共享，失敗時為默認值)
+        rf = futures["rf"].result()
 
-        return {
-            "price": current_price,
-            "market_cap": float(market_cap) if market_cap else 0.0,
-            "shares_outstanding": float(shares) if shares else 0.0,
-            "sector": info.get("sector", "Unknown"),
-            "beta": info.get("beta", 1.0),
-            "pe_ratio": info.get("trailingPE"),
-            "peg_ratio": info.get("pegRatio"),
-            "risk_free_rate": rf,
-            "total_debt": total_debt,
-            "cash_and_equivalents": cash_eq,
-            "ebit": ebit,
-            "interest_expense": interest_expense,
-            "sbc": sbc,
-            "fcf_ttm": float(fcf_ttm) if fcf_ttm else 0.0,
-            "roe": info.get("returnOnEquity"),
-            "payout_ratio": info.get("payoutRatio"),
-            "fcf_data_source": "yfinance_info" if fcf_ttm else "calculated"
-        }
+        return MarketData(
+            price=current_price,
+            market_cap=float(market_cap) if market_cap else 0.0,
+            shares_outstanding=float(shares) if shares else 0.0,
+            sector=info.get("sector", "Unknown"),
+            beta=info.get("beta", 1.0),
+            pe_ratio=info.get("trailingPE"),
+            peg_ratio=info.get("pegRatio"),
+            risk_free_rate=rf,
+            total_debt=total_debt,
+            cash_and_equivalents=cash_eq,
+            ebit=ebit,
+            interest_expense=interest_expense,
+            sbc=sbc,
+            fcf_ttm=float(fcf_ttm) if fcf_ttm else 0.0,
+            roe=info.get("returnOnEquity"),
+            payout_ratio=info.get("payoutRatio"),
+            fcf_data_source="yfinance_info" if fcf_ttm else "calculated"
+        )
     except Exception as e:
-        print(f"❌ [Data Fetcher] Error: {e}")
+        logger.error("❌ [Data Fetcher] get_market_data_raw(%s) failed: %s",
+                     ticker, e, exc_info=logger.isEnabledFor(logging.DEBUG))
         return None
 
+@daily_cache
+@cached("normalized_income", ttl=FUNDAMENTALS_TTL)
 def get_normalized_income_data(ticker: str) -> dict:
     try:
-        stock = yf.Ticker(ticker)
-        fin_df = stock.financials
+        fin_df = _financials(ticker)
         if fin_df.empty: return None
-        latest_date = fin_df.columns[0]
+        rows = frozenset(fin_df.index)
         
         normalized_income = 0.0
         use_normalized = False
-        if 'Normalized Income' in fin_df.index:
-            normalized_income = fin_df.loc['Normalized Income', latest_date]
+        if 'Normalized Income' in rows:
+            normalized_income = _latest_value(fin_df, 'Normalized Income')
             use_normalized = True
-        elif 'Net Income' in fin_df.index:
-            normalized_income = fin_df.loc['Net Income', latest_date]
+        elif 'Net Income' in rows:
+            normalized_income = _latest_value(fin_df, 'Net Income')
         
-        raw_net_income = fin_df.loc['Net Income', latest_date] if 'Net Income' in fin_df.index else normalized_income
+        raw_net_income = _latest_value(fin_df, 'Net Income') if 'Net Income' in rows else normalized_income
         
         return {
             "normalized_income": float(normalized_income), 
             "use_normalized": use_normalized,
             "raw_net_income": float(raw_net_income)
         }
-    except: return None
+    except Exception as e:
+        # 完整 traceback 僅在 DEBUG 時輸出，批量模式下失敗的股票不刷屏
+        logger.warning("⚠️ [Data Fetcher] get_normalized_income_data(%s) failed: %s",
+                       ticker, e, exc_info=logger.isEnabledFor(logging.DEBUG))
+        return None
 
+def fetch_all(ticker: str) -> tuple:
+    """
+    [Fetcher] 並行獲取計算節點所需的三份 yfinance 數據 (互相獨立的網絡請求)，
+    耗時由三者之和降為最大值。單項失敗只置為 None，不影響其它數據。
+    
+    Returns:
+        tuple: (market_data, nri_data, hist_growth)
+    """
+    fetchers = (get_market_data_raw, get_normalized_income_data, calculate_historical_growth)
+    with ThreadPoolExecutor(max_workers=len(fetchers)) as ex:
+        futures = [ex.submit(fetch, ticker) for fetch in fetchers]
+    
+    results = []
+    for fetch, future in zip(fetchers, futures):
+        try:
+            results.append(future.result())
+        except Exception:
+            logger.warning("⚠️ [Data Fetcher] %s failed for %s", fetch.__name__, ticker, exc_info=True)
+            results.append(None)
+    return tuple(results)
+
+
+def fetch_all_batch(tickers: List[str], max_workers: int = 10) -> Dict[str, tuple]:
+    """
+    [Fetcher] 批量並行獲取多隻股票的計算輸入 (Watchlist / Portfolio 模式)。
+    
+    Returns:
+        dict: ticker -> fetch_all(ticker) result (duplicates fetched once)
+    """
+    tickers = list(dict.fromkeys(tickers))
+    if not tickers:
+        return {}
+    
+    # 報價一次批量下載 (~1 個請求代替 N+1 個)，其餘端點按股票並行
+    prefetch_quotes(tickers + ["^TNX"])
+    with ThreadPoolExecutor(max_workers=min(len(tickers), max_workers)) as ex:
+        return dict(zip(tickers, ex.map(fetch_all, tickers)))
+
+
+@njit(cache=True)
+def _cagr_kernel(values):
+    """
+    CAGR of an oldest -> newest series (NaN entries are skipped).
+    Returns NaN when there are fewer than 4 points or the base is not positive.
+    """
+    clean = values[~np.isnan(values)]
+    n = clean.shape[0]
+    if n < 4 or clean[0] <= 0: return np.nan
+    if clean[-1] <= 0: return -0.05
+    # expm1(log(ratio) / years) == ratio ** (1/years) - 1，低增長率時不損失精度
+    return np.expm1(np.log(clean[-1] / clean[0]) / (n - 1))
+
+
+@daily_cache
+@cached("historical_growth", ttl=FUNDAMENTALS_TTL)
 def calculate_historical_growth(ticker: str) -> float:
     try:
-        stock = yf.Ticker(ticker)
-        fin_df = stock.financials
+        fin_df = _financials(ticker)
         if fin_df.empty or len(fin_df.columns) < 2: return None
         
+        rows = frozenset(fin_df.index)
         target_row = None
-        if 'Normalized Income' in fin_df.index: target_row = 'Normalized Income'
-        elif 'Net Income' in fin_df.index: target_row = 'Net Income'
+        if 'Normalized Income' in rows: target_row = 'Normalized Income'
+        elif 'Net Income' in rows: target_row = 'Net Income'
         if not target_row: return None
             
-        values = fin_df.loc[target_row].values[::-1]
-        values = [v for v in values if v is not None and not np.isnan(v)]
-        if len(values) < 4 or values[0] <= 0: return None
-        if values[-1] <= 0: return -0.05
-            
-        return float((values[-1] / values[0]) ** (1 / (len(values) - 1)) - 1)
-    except: return None
+        # 舊 -> 新排列 (float64 轉換會把 None 變成 NaN，由 kernel 過濾)
+        values = np.ascontiguousarray(fin_df.values[fin_df.index.get_loc(target_row)][::-1], dtype=np.float64)
+        cagr = _cagr_kernel(values)
+        return None if np.isnan(cagr) else float(cagr)
+    except Exception as e:
+        logger.warning("⚠️ [Data Fetcher] calculate_historical_growth(%s) failed: %s",
+                       ticker, e, exc_info=logger.isEnabledFor(logging.DEBUG))
+        return None
 
-def calculate_dcf(
-    start_value: float,
-    shares_outstanding: float,
-    net_debt: float,
+
+def _readonly(arr: np.ndarray) -> np.ndarray:
+    """Mark a shared / cached array read-only and return it."""
+    arr.setflags(write=False)
+    return arr
+
+
+# 常用預測期的年份向量 1..N，在模塊加載時一次性分配 (只讀，所有股票共享)
+_PROJECTION_YEARS = {n: _readonly(np.arange(1, n + 1, dtype=np.float64)) for n in (5, 10)}
+
+
+def _year_vector(projection_years: int) -> np.ndarray:
+    """Years 1..N as float64 (shared read-only array for the common horizons)."""
+    years = _PROJECTION_YEARS.get(projection_years)
+    return years if years is not None else np.arange(1, projection_years + 1, dtype=np.float64)
+
+
+def _growth_path(growth_rate: float, terminal_growth: float, projection_years: int, fade_start_year: int) -> np.ndarray:
+    """Per-year growth: flat until fade_start_year, then linear fade toward terminal_growth."""
+    years = _year_vector(projection_years)
+    growth_path = np.full(projection_years, growth_rate, dtype=np.float64)
+    
+    if projection_years > fade_start_year:
+        decay_step = (growth_rate - terminal_growth) / (projection_years - fade_start_year + 1)
+        fade = years > fade_start_year
+        growth_path[fade] = np.maximum(terminal_growth, growth_rate - decay_step * (years[fade] - fade_start_year))
+    return growth_path
+
+
+@lru_cache(maxsize=4096)
+def _growth_factors(growth_rate: float, terminal_growth: float, projection_years: int, fade_start_year: int) -> np.ndarray:
+    """Cumulative growth factors per year (read-only, cached on the exact inputs)."""
+    return _readonly(np.cumprod(1 + _growth_path(growth_rate, terminal_growth, projection_years, fade_start_year)))
+
+
+def _dcf_core(
+    start_values,
+    discount_rates,
     growth_rate: float,
-    discount_rate: float,
-    terminal_growth: float = 0.025,
-    projection_years: int = 10,
-    fade_start_year: int = 5,
-    exit_multiple: float = None, # [New] 接收退出倍數
-    method: str = "FCF") -> dict:
+    terminal_growth: float,
+    projection_years: int,
+    fade_start_year: int,
+    exit_multiple: float = None) -> tuple:
     """
-    純數學引擎：計算 DCF，包含 Linear Fade Growth 和 Dual Terminal Value。
+    向量化 DCF 核心：每一行是一條估值軌道 (start_value, discount_rate)，
+    所有軌道共享同一增長路徑與退出倍數。
+    
+    Returns:
+        tuple: (pv_explicit, tv_gordon, tv_exit, pv_terminal) - arrays, one entry per track
     """
-    if shares_outstanding == 0 or start_value is None:
-        return {"intrinsic_value": 0.0}
+    start_values = np.asarray(start_values, dtype=np.float64)
+    discount_rates = np.asarray(discount_rates, dtype=np.float64)
     
-    # 1. Cash Flow Projection with Fade
-    future_flows = []
-    current_val = start_value
-    current_growth = growth_rate
-    decay_step = 0.0
+    # 1. Cash Flow Projection with Fade (vectorized over tracks x years)
+    # 增長因子只依賴 (增長率, 期限)，按精確值緩存；折現因子一次廣播冪運算 (比逐個折現率查緩存更快)
+    growth_factors = _growth_factors(growth_rate, terminal_growth, projection_years, fade_start_year)
+    flows = start_values[:, None] * growth_factors[None, :]
+    discount_factors = (1 + discount_rates[:, None]) ** _year_vector(projection_years)[None, :]
+    pv_explicit = (flows / discount_factors).sum(axis=1)
+    
+    # 2. Terminal Value (Dual Method)
+    last_val = flows[:, -1]
     
+    # Method A: Gordon Growth
+    final_disc = np.maximum(discount_rates, terminal_growth + 0.01) # Math safety
+    tv_gordon = (last_val * (1 + terminal_growth)) / (final_disc - terminal_growth)
+    
+    # Method B: Exit Multiple (取平均 Blended TV；未提供時僅用 Gordon)
+    if exit_multiple is not None:
+        tv_exit = last_val * exit_multiple
+        terminal_value_raw = (tv_gordon + tv_exit) / 2
+    else:
+        tv_exit = tv_gordon
+        terminal_value_raw = tv_gordon
+    
+    pv_terminal = terminal_value_raw / discount_factors[:, -1]
+    return pv_explicit, tv_gordon, tv_exit, pv_terminal
+
+
+@njit(cache=True)
+def _dcf_track_kernel(start, rate, growth_rate, exit_multiple, terminal_growth, projection_years, fade_start_year):
+    """
+    Scalar DCF for one track (start value, discount rate); same math as _dcf_core(),
+    used by the per-ticker loop in _dcf_multi_kernel.
+    exit_multiple NaN means Gordon-only terminal value.
+    
+    Returns:
+        tuple: (pv_explicit, tv_gordon, tv_exit, pv_terminal)
+    """
+    decay_step = 0.0
     if projection_years > fade_start_year:
         decay_step = (growth_rate - terminal_growth) / (projection_years - fade_start_year + 1)
-
+    
+    factor = 1.0
+    disc = 1.0
+    pv_explicit = 0.0
     for year in range(1, projection_years + 1):
+        g_year = growth_rate
         if year > fade_start_year:
-            current_growth = max(terminal_growth, current_growth - decay_step)
-        
-        current_val = current_val * (1 + current_growth)
-        pv = current_val / ((1 + discount_rate) ** year)
-        future_flows.append({"val": current_val, "pv": pv})
+            g_year = max(terminal_growth, growth_rate - decay_step * (year - fade_start_year))
+        factor *= 1 + g_year
+        disc *= 1 + rate
+        pv_explicit += start * factor / disc
     
-    pv_explicit = sum(f["pv"] for f in future_flows)
+    last_val = start * factor
+    final_disc = max(rate, terminal_growth + 0.01) # Math safety
+    tv_gordon = (last_val * (1 + terminal_growth)) / (final_disc - terminal_growth)
+    tv_exit = tv_gordon
+    terminal_value = tv_gordon
+    if exit_multiple == exit_multiple:
+        tv_exit = last_val * exit_multiple
+        terminal_value = (tv_gordon + tv_exit) / 2
+    return pv_explicit, tv_gordon, tv_exit, terminal_value / disc
+
+
+def calculate_dcf_batched(
+    start_values,
+    shares_outstanding: float,
+    net_debts,
+    growth_rate: float,
+    discount_rates,
+    terminal_growth: float = 0.025,
+    projection_years: int = 10,
+    fade_start_year: int = 5,
+    exit_multiple: float = None) -> np.ndarray:
+    """
+    批量 DCF：一次向量化計算多條軌道 (如 FCF/WACC 與 EPS/Ke、保守/樂觀情景)。
     
-    # 2. Terminal Value (Dual Method)
-    last_val = future_flows[-1]["val"]
+    The tracks share growth path (linear fade), exit multiple and share count,
+    and differ in start value, net debt and discount rate.
     
-    # Method A: Gordon Growth
-    final_disc = max(discount_rate, terminal_growth + 0.01) # Math safety
-    tv_gordon = (last_val * (1 + terminal_growth)) / (final_disc - terminal_growth)
+    Returns:
+        np.ndarray: Intrinsic value per share for each track (rounded to cents)
+    """
+    start_values = np.asarray(start_values, dtype=np.float64)
+    if shares_outstanding == 0:
+        return np.zeros(len(start_values))
     
-    # Method B: Exit Multiple
-    tv_exit = tv_gordon # Default fallback
-    use_dual = False
+    pv_explicit, _, _, pv_terminal = _dcf_core(
+        start_values, discount_rates, growth_rate, terminal_growth,
+        projection_years, fade_start_year, exit_multiple
+    )
+    equity_value = pv_explicit + pv_terminal - np.asarray(net_debts, dtype=np.float64)
+    return np.round(np.maximum(0.0, equity_value / shares_outstanding), 2)
+
+
+def calculate_dcf_grid(
+    start_value: float,
+    shares_outstanding: float,
+    net_debt: float,
+    growth_rates,
+    discount_rates,
+    terminal_growths=(0.025,),
+    projection_years: int = 10,
+    fade_start_year: int = 5,
+    exit_multiple: float = None) -> np.ndarray:
+    """
+    敏感度分析：在 增長率 x 折現率 x 永續增長率 網格上計算 DCF，
+    用於輸出估值區間而不是單點估值。
     
-    if exit_multiple is not None:
-        tv_exit = last_val * exit_multiple
-        use_dual = True
-        
-    # 取平均 (Blended TV)
-    terminal_value_raw = (tv_gordon + tv_exit) / 2 if use_dual else tv_gordon
+    Each (growth, terminal growth) pair is one _dcf_core() call over all
+    discount rates, so the grid shares the fade / terminal value rules with
+    calculate_dcf_batched().
     
-    pv_terminal = terminal_value_raw / ((1 + discount_rate) ** projection_years)
+    Returns:
+        np.ndarray: Shape (len(growth_rates), len(discount_rates), len(terminal_growths)) -
+            intrinsic value per share, rounded to cents
+    """
+    growth_rates = np.asarray(growth_rates, dtype=np.float64)
+    discount_rates = np.asarray(discount_rates, dtype=np.float64)
+    terminal_growths = np.asarray(terminal_growths, dtype=np.float64)
+    grid = np.zeros((len(growth_rates), len(discount_rates), len(terminal_growths)))
+    if shares_outstanding == 0:
+        return grid
     
-    # 3. Sum & Equity Value
-    enterprise_value = pv_explicit + pv_terminal
-    equity_value = enterprise_value - net_debt # Net Debt 可為正或負
-    intrinsic_value = max(0, equity_value / shares_outstanding)
+    start_values = np.full(len(discount_rates), start_value, dtype=np.float64)
+    for i, g in enumerate(growth_rates.tolist()):
+        for k, tg in enumerate(terminal_growths.tolist()):
+            pv_explicit, _, _, pv_terminal = _dcf_core(
+                start_values, discount_rates, g, tg,
+                projection_years, fade_start_year, exit_multiple
+            )
+            grid[i, :, k] = pv_explicit + pv_terminal - net_debt
+    return np.round(np.maximum(0.0, grid / shares_outstanding), 2)
+
+
+@njit(parallel=True, cache=True)
+def _dcf_multi_kernel(start_fcf, start_eps, wacc, ke, growth, exit_multiple, shares, net_debt,
+                      terminal_growth, projection_years, fade_start_year):
+    """
+    Scalar DCF loop over tickers (prange) x tracks (FCF/WACC, EPS/Ke).
+    exit_multiple NaN means Gordon-only terminal value.
+    """
+    n = start_fcf.shape[0]
+    out = np.zeros((n, 2))
+    for i in prange(n):
+        if shares[i] == 0:
+            continue
+        for track in range(2):
+            # Track 0: FCF / WACC / Net Debt；Track 1: EPS / Ke / Net Debt = 0
+            start = start_fcf[i] if track == 0 else start_eps[i]
+            rate = wacc[i] if track == 0 else ke[i]
+            debt = net_debt[i] if track == 0 else 0.0
+            
+            pv_explicit, _, _, pv_terminal = _dcf_track_kernel(
+                start, rate, growth[i], exit_multiple[i],
+                terminal_growth, projection_years, fade_start_year
+            )
+            equity_value = pv_explicit + pv_terminal - debt
+            out[i, track] = max(0.0, equity_value / shares[i])
+    return out
+
+
+def calculate_dcf_multi(
+    start_values_fcf,
+    start_values_eps,
+    wacc,
+    ke,
+    growth,
+    shares,
+    net_debt,
+    exit_multiples=None,
+    terminal_growth: float = 0.025,
+    projection_years: int = 10,
+    fade_start_year: int = 5) -> np.ndarray:
+    """
+    多股票批量 DCF (Watchlist / Portfolio 模式)：每隻股票的 FCF/WACC 與 EPS/Ke 兩條軌道，
+    股票維度由 numba prange 並行 (未安裝 numba 時按順序執行)。
     
-    # Debug note
-    tv_note = f"Gordon=${tv_gordon/1e9:.1f}B"
-    if use_dual:
-        tv_note = f"Avg(Gordon=${tv_gordon/1e9:.1f}B, Exit={exit_multiple:.1f}x=${tv_exit/1e9:.1f}B)"
+    Same math as calculate_dcf_batched(); every argument except the horizon
+    settings is a per-ticker sequence. exit_multiples entries may be None.
     
-    tv_conc = pv_terminal / (pv_explicit + pv_terminal) if (pv_explicit + pv_terminal) > 0 else 0
+    Returns:
+        np.ndarray: Shape (n_tickers, 2) - [FCF value, EPS value] per share, rounded to cents
+    """
+    n = len(start_values_fcf)
+    if exit_multiples is None:
+        exit_multiples = np.full(n, np.nan)
+    else:
+        exit_multiples = np.array([np.nan if m is None else m for m in exit_multiples], dtype=np.float64)
     
-    return {
-        "intrinsic_value": round(intrinsic_value, 2),
-        "tv_concentration": round(tv_conc, 2),
-        "note": f"{method} | TV: {tv_note}"
-    }
\ No newline at end of file
+    out = _dcf_multi_kernel(
+        np.asarray(start_values_fcf, dtype=np.float64), np.asarray(start_values_eps, dtype=np.float64),
+        np.asarray(wacc, dtype=np.float64), np.asarray(ke, dtype=np.float64),
+        np.asarray(growth, dtype=np.float64), exit_multiples,
+        np.asarray(shares, dtype=np.float64), np.asarray(net_debt, dtype=np.float64),
+        float(terminal_growth), int(projection_years), int(fade_start_year)
+    )
+    return np.round(out, 2)
@@ -7,12 +7,16 @@ This node orchestrates the data mining process:
 3. Extracts structured data using Gemini (leverages long context window)
 """
 
+import logging
 import os
 from langchain_google_genai import ChatGoogleGenerativeAI
 from src.state import AgentState
 from src.models.financial import FinancialStatements
 from src.nodes.data_miner.tools import fetch_10k_text
 
+# 進度追蹤走 logging (INFO)，默認 WARNING 時跳過格式化與 stdout 寫入；異常堆棧為 ERROR
+logger = logging.getLogger(__name__)
+
 
 def data_miner_node(state: AgentState) -> dict:
     """
@@ -27,15 +31,15 @@ def data_miner_node(state: AgentState) -> dict:
         dict: Updated state with financial_data (FinancialStatements) or error
     """
     ticker = state['ticker']
-    print(f"\n⛏️  [Node A: Miner] 正在處理 {ticker} ...")
+    logger.info("⛏️  [Node A: Miner] 正在處理 %s ...", ticker)
     
     # 1. 檢查人工/緩存數據
     if state.get("sec_text_chunk"):
-        print("✅ 使用現有文本數據...")
+        logger.info("✅ 使用現有文本數據...")
         raw_text = state["sec_text_chunk"]
     else:
         # 2. 自動下載
-        print("☁️  正在調用 SEC 下載工具...")
+        logger.info("☁️  正在調用 SEC 下載工具...")
         user_agent = os.getenv("SEC_API_USER_AGENT")
         if not user_agent:
             return {"error": "Missing SEC_API_USER_AGENT in .env"}
@@ -46,11 +50,11 @@ def data_miner_node(state: AgentState) -> dict:
             if not raw_text:
                 raise ValueError("Downloaded text is empty")
         except Exception as e:
-            print(f"❌ 下載失敗: {e}")
+            logger.error("❌ 下載失敗 (%s): %s", ticker, e)
             return {"error": "download_failed"}
     
     # 3. Gemini 結構化提取
-    print("🤖 調用 Gemini 進行提取...")
+    logger.info("🤖 調用 Gemini 進行提取...")
     
     try:
         # 初始化模型 (確保 .env 有 GOOGLE_API_KEY)
@@ -95,7 +99,7 @@ def data_miner_node(state: AgentState) -> dict:
         
         # 執行推理
         result = structured_llm.invoke(prompt)
-        print(f"📊 提取成功: {result}")
+        logger.info("📊 提取成功: %s", result)
         
         return {
             "financial_data": result,  # 返回 Pydantic 對象
@@ -104,7 +108,5 @@ def data_miner_node(state: AgentState) -> dict:
         }
         
     except Exception as e:
-        print(f"❌ Gemini 提取失敗: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("❌ Gemini 提取失敗 (%s): %s", ticker, e)
         return {"error": "extraction_failed"}
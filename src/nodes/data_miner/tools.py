@@ -10,9 +10,11 @@ Note: With Gemini's large context window, we can pass large
 10-K sections directly to the LLM without complex chunking logic.
 """
 
-import os
 import glob
+import logging
+import os
 import re
+from typing import Optional
 from sec_edgar_downloader import Downloader
 from bs4 import BeautifulSoup
 from markdownify import markdownify
@@ -21,6 +23,8 @@ from markdownify import markdownify
 # 確保路徑相對於當前文件是正確的
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../data"))
 
+logger = logging.getLogger(__name__)
+
 
 def get_sec_downloader(user_agent: str) -> Downloader:
     """
@@ -35,12 +39,42 @@ def get_sec_downloader(user_agent: str) -> Downloader:
     return Downloader("MyAIOrg", user_agent, BASE_DIR)
 
 
+def find_cached_filing(ticker: str) -> Optional[str]:
+    """
+    Locate an already-downloaded 10-K for ticker under BASE_DIR.
+    
+    Args:
+        ticker: Stock ticker symbol (e.g., "AAPL")
+        
+    Returns:
+        str | None: Path to the filing (HTML preferred, then TXT), or None if not cached
+    """
+    # --- [Fix] 修改文件查找邏輯：支持 HTML 和 TXT 格式 ---
+    
+    # 定義基礎搜索路徑: data/sec-edgar-filings/{ticker}/10-K/{accession}/
+    base_search_path = os.path.join(BASE_DIR, "sec-edgar-filings", ticker, "10-K", "*")
+    
+    # 策略 A: 先找 HTML (Primary Document)
+    html_files = glob.glob(os.path.join(base_search_path, "*.html"))
+    if html_files:
+        logger.info("📄 [Tool] 找到 HTML 格式文件")
+        return html_files[0]
+    
+    # 策略 B: 再找 TXT (Full Submission) - 新版本 sec-edgar-downloader 可能下載此格式
+    txt_files = glob.glob(os.path.join(base_search_path, "*.txt"))
+    if txt_files:
+        logger.info("📄 [Tool] 找到 TXT (Full Submission) 格式文件")
+        return txt_files[0]
+    
+    return None
+
+
 def fetch_10k_text(ticker: str, user_agent: str) -> str:
     """
     Download the latest 10-K filing and extract financial statements text.
     
     Steps:
-    1. Download latest 10-K from SEC EDGAR
+    1. Reuse a cached 10-K under data/ if present, otherwise download it from SEC EDGAR
     2. Extract financial statements section (Markdown format)
     3. Return cleaned text for LLM processing
     
@@ -56,43 +90,31 @@ def fetch_10k_text(ticker: str, user_agent: str) -> str:
         FileNotFoundError: If downloaded file cannot be located
     """
     try:
-        print(f"📥 [Tool] 正在從 SEC 下載 {ticker} 的 10-K (User-Agent: {user_agent})...")
-        dl = get_sec_downloader(user_agent)
-        
-        # 下載 1 份最新的 10-K
-        # download_details=False 只下載主文檔
-        num_downloaded = dl.get("10-K", ticker, limit=1, download_details=False)
-        
-        if num_downloaded == 0:
-            raise ValueError("SEC 下載器未找到任何文件")
-        
-        # --- [Fix] 修改文件查找邏輯：支持 HTML 和 TXT 格式 ---
-        
-        # 定義基礎搜索路徑: data/sec-edgar-filings/{ticker}/10-K/{accession}/
-        base_search_path = os.path.join(BASE_DIR, "sec-edgar-filings", ticker, "10-K", "*")
+        # Miner 重試 (human_help -> miner) 時不重複下載：已緩存的財報直接讀取
+        target_file = find_cached_filing(ticker)
         
-        # 策略 A: 先找 HTML (Primary Document)
-        html_files = glob.glob(os.path.join(base_search_path, "*.html"))
-        
-        # 策略 B: 再找 TXT (Full Submission) - 新版本 sec-edgar-downloader 可能下載此格式
-        txt_files = glob.glob(os.path.join(base_search_path, "*.txt"))
-        
-        target_file = None
-        
-        if html_files:
-            target_file = html_files[0]
-            print("📄 [Tool] 找到 HTML 格式文件")
-        elif txt_files:
-            target_file = txt_files[0]
-            print("📄 [Tool] 找到 TXT (Full Submission) 格式文件")
+        if target_file:
+            logger.info("♻️  [Tool] 使用本地緩存的 %s 10-K，跳過下載", ticker)
         else:
-            raise FileNotFoundError(f"無法在 {base_search_path} 找到 HTML 或 TXT 文件")
+            logger.info("📥 [Tool] 正在從 SEC 下載 %s 的 10-K (User-Agent: %s)...", ticker, user_agent)
+            dl = get_sec_downloader(user_agent)
+            
+            # 下載 1 份最新的 10-K
+            # download_details=False 只下載主文檔
+            num_downloaded = dl.get("10-K", ticker, limit=1, download_details=False)
+            
+            if num_downloaded == 0:
+                raise ValueError("SEC 下載器未找到任何文件")
+            
+            target_file = find_cached_filing(ticker)
+            if not target_file:
+                raise FileNotFoundError(f"無法在 {os.path.join(BASE_DIR, 'sec-edgar-filings', ticker)} 找到 HTML 或 TXT 文件")
         
-        print(f"📄 [Tool] 讀取文件路徑: {target_file}")
+        logger.info("📄 [Tool] 讀取文件路徑: %s", target_file)
         with open(target_file, "r", encoding="utf-8", errors="ignore") as f:
             html_content = f.read()
         
-        print(f"🧹 [Tool] 正在清洗內容 (原始大小: {len(html_content)} chars)...")
+        logger.info("🧹 [Tool] 正在清洗內容 (原始大小: %d chars)...", len(html_content))
         
         # --- 智能截取策略 ---
         # 即使是 .txt 的 full-submission，BeautifulSoup 也能解析其中的 HTML 標籤
@@ -118,16 +140,16 @@ def fetch_10k_text(ticker: str, user_agent: str) -> str:
             idx = text_content.find(t)
             if idx != -1:
                 start_idx = idx
-                print(f"📍 [Tool] 定位到關鍵詞: {t}")
+                logger.debug("📍 [Tool] 定位到關鍵詞: %s", t)
                 break
         
         # 如果找不到，就取文檔後半部分 (通常財報在後面)
         if start_idx == -1:
-            print("⚠️ [Tool] 未找到關鍵詞，使用文檔後半部分...")
+            logger.warning("⚠️ [Tool] 未找到關鍵詞，使用文檔後半部分...")
             start_idx = len(html_content) // 2
         
         # --- 轉換為 Markdown ---
-        print("🔄 [Tool] 正在轉換為 Markdown (這可能需要幾秒鐘)...")
+        logger.info("🔄 [Tool] 正在轉換為 Markdown (這可能需要幾秒鐘)...")
         # markdownify 會自動忽略 SEC-HEADER 這種非 HTML 標籤，只保留表格
         # 即使是 full-submission.txt，其中的 HTML 標籤也能被正確轉換
         full_markdown = markdownify(html_content)
@@ -150,6 +172,6 @@ def fetch_10k_text(ticker: str, user_agent: str) -> str:
             return full_markdown[mid : mid + 80000]
             
     except Exception as e:
-        print(f"❌ [Tool Error] {str(e)}")
+        logger.error("❌ [Tool Error] %s", e)
         # 拋出異常，讓 Node 捕獲並轉為 error 狀態
         raise e
@@ -6,7 +6,7 @@ This module handles human intervention at critical decision points:
 - Error correction
 - Analysis assumption adjustments
 
-Supports state updates through update_state mechanism.
+Supports state updates through interrupt() / Command(resume=...).
 """
 
 from .node import request_human_help_node
@@ -3,32 +3,43 @@ Human-in-the-Loop Node - Main Node Logic
 
 This node handles human intervention:
 1. Displays current state and error information
-2. Accepts manual data injection (e.g., local SEC filing)
-3. Updates state based on human input
+2. Pauses the graph via interrupt() and waits for manual data injection
+3. Updates state with the value passed back through Command(resume=...)
 4. Routes back to appropriate node based on correction type
 """
 
+from langgraph.types import interrupt
+
 from src.state import AgentState
 
 
 def request_human_help_node(state: AgentState) -> dict:
     """
     Human-in-the-loop node function.
-    
+
     This node is called when the system needs human intervention.
-    It displays the current error and waits for user input.
-    
+    It displays the current error and pauses until the driver resumes
+    the graph with `Command(resume=<sec_text>)`.
+
+    Note: code before interrupt() re-executes on resume, keep it side-effect free.
+
     Returns:
-        dict: Empty dict (state updates happen via update_state in main.py)
+        dict: Injected sec_text_chunk with the error flag cleared
     """
     print("\n🆘 [Node: Human Help] 等待數據注入...")
-    
+
     error = state.get("error")
     ticker = state.get("ticker", "UNKNOWN")
-    
+
     if error:
         print(f"   ⚠️  錯誤類型: {error}")
         print(f"   📊 股票代碼: {ticker}")
-        print("   💡 提示: 請通過 update_state 注入 sec_text_chunk 數據")
-    
-    return {}
+        print("   💡 提示: 請通過 Command(resume=...) 注入 sec_text_chunk 數據")
+
+    # 暫停圖執行；恢復時直接拿到注入的文本，無需額外的 update_state checkpoint
+    sec_text = interrupt({"error": error, "ticker": ticker})
+
+    return {
+        "sec_text_chunk": sec_text,
+        "error": None
+    }
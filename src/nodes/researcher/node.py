@@ -7,12 +7,16 @@ This node orchestrates deep research:
 3. Synthesizes qualitative insights using Gemini
 """
 
+import logging
 import os
 from langchain_google_genai import ChatGoogleGenerativeAI
 from src.state import AgentState
 from src.models.analysis import QualitativeAnalysis
 from src.nodes.researcher.tools import search_market_news
 
+# 異常堆棧走 logging (ERROR 級別)，不再直接寫 stdout
+logger = logging.getLogger(__name__)
+
 
 def researcher_node(state: AgentState) -> dict:
     """
@@ -29,8 +33,8 @@ def researcher_node(state: AgentState) -> dict:
     ticker = state['ticker']
     tasks = state.get("investigation_tasks", [])
     
-    print(f"\n🔍 [Node C: Researcher] 正在分析 {ticker} 的基本面與情緒...")
-    print(f"📋 [Investigation] 待調查的異常點: {len(tasks)} 個")
+    logger.info("🔍 [Node C: Researcher] 正在分析 %s 的基本面與情緒...", ticker)
+    logger.info("📋 [Investigation] 待調查的異常點: %d 個", len(tasks))
     
     # 1. 構建搜索查詢
     # 基礎查詢
@@ -38,7 +42,7 @@ def researcher_node(state: AgentState) -> dict:
     
     # [Fix] 加入來自 Calculator 的定向查詢
     if tasks:
-        print(f"🕵️‍♀️ [Deep Dive] 檢測到異常，追加定向搜索: {tasks}")
+        logger.info("🕵️‍♀️ [Deep Dive] 檢測到異常，追加定向搜索: %s", tasks)
         queries.extend(tasks)
     
     # 2. 執行搜索 (循環調用 search_market_news)
@@ -56,7 +60,7 @@ def researcher_node(state: AgentState) -> dict:
     metrics_context = f"P/E: {metrics.pe_ratio}, Status: {metrics.valuation_status}" if metrics else "N/A"
     
     # 4. 調用 Gemini 進行綜合分析
-    print("🤖 調用 Gemini 綜合分析 (News + SEC + Financials)...")
+    logger.info("🤖 調用 Gemini 綜合分析 (News + SEC + Financials)...")
     
     try:
         llm = ChatGoogleGenerativeAI(
@@ -107,7 +111,7 @@ def researcher_node(state: AgentState) -> dict:
 """
         
         result = structured_llm.invoke(prompt)
-        print(f"💡 分析完成: Sentiment={result.market_sentiment}")
+        logger.info("💡 分析完成: Sentiment=%s", result.market_sentiment)
         
         return {
             "qualitative_analysis": result,
@@ -115,7 +119,5 @@ def researcher_node(state: AgentState) -> dict:
         }
         
     except Exception as e:
-        print(f"❌ Researcher Error: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("❌ Researcher Error (%s): %s", ticker, e)
         return {"error": "research_failed"}
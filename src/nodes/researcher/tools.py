@@ -6,9 +6,12 @@ This module contains research utilities:
 2. News aggregation and context building
 """
 
+import logging
 import os
 from tavily import TavilyClient
 
+logger = logging.getLogger(__name__)
+
 
 def search_market_news(query: str) -> str:
     """
@@ -26,7 +29,7 @@ def search_market_news(query: str) -> str:
     
     try:
         tavily = TavilyClient(api_key=api_key)
-        print(f"🔍 [Tool] 正在搜索: {query}")
+        logger.info("🔍 [Tool] 正在搜索: %s", query)
         
         # 搜索最近 3-5 天的高權重內容
         response = tavily.search(
@@ -42,6 +45,6 @@ def search_market_news(query: str) -> str:
         
         return context
     except Exception as e:
-        print(f"❌ Tavily Search Error: {e}")
+        logger.error("❌ Tavily Search Error: %s", e)
         return "No news found due to error."
 
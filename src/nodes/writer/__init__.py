@@ -8,7 +8,7 @@ Uses Gemini for high-quality report generation, leveraging its
 large context window to incorporate all analysis results.
 """
 
-from .node import writer_node
+from .node import writer_node, load_report
 
-__all__ = ["writer_node"]
+__all__ = ["writer_node", "load_report"]
 
@@ -5,14 +5,46 @@ This node generates the final equity research report:
 1. Aggregates all structured and unstructured data
 2. Structures the report using a professional template
 3. Generates comprehensive Markdown report using Gemini
+4. Stores the report body in the LangGraph Store (state keeps only a reference)
 """
 
+import logging
+from typing import Optional
+
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import HumanMessage
+from langchain_core.runnables import RunnableConfig
+from langgraph.store.base import BaseStore
 from src.state import AgentState
 
+# 異常堆棧走 logging (ERROR 級別)，不再直接寫 stdout
+logger = logging.getLogger(__name__)
+
+# 報告正文存放於 Store 的 ("reports", thread_id) 命名空間
+# 避免長文本隨之後的每個 checkpoint 重複序列化
+REPORTS_NAMESPACE = "reports"
+REPORT_KEY = "final"
+
+
+def report_namespace(thread_id: str) -> tuple:
+    """Store namespace holding the reports of one thread."""
+    return (REPORTS_NAMESPACE, thread_id)
+
+
+async def load_report(store: BaseStore, thread_id: str, report_ref: Optional[str]) -> Optional[str]:
+    """
+    Fetch the report body that writer_node stored under `report_ref`.
+    
+    Returns:
+        str | None: Markdown report, or None if nothing was stored
+    """
+    if not report_ref:
+        return None
+    item = await store.aget(report_namespace(thread_id), report_ref)
+    return item.value["content"] if item else None
+
 
-def writer_node(state: AgentState) -> dict:
+def writer_node(state: AgentState, config: RunnableConfig, *, store: BaseStore) -> dict:
     """
     Writer node function.
     
@@ -21,9 +53,9 @@ def writer_node(state: AgentState) -> dict:
     2. Generates comprehensive investment report using Gemini
     
     Returns:
-        dict: Updated state with final_report or error
+        dict: Updated state with report_ref or error
     """
-    print(f"\n✍️  [Node D: Writer] 正在撰寫 {state['ticker']} 最終報告...")
+    logger.info("✍️  [Node D: Writer] 正在撰寫 %s 最終報告...", state['ticker'])
     
     # 收集所有素材
     ticker = state['ticker']
@@ -108,13 +140,14 @@ def writer_node(state: AgentState) -> dict:
         
         response = llm.invoke([HumanMessage(content=prompt)])
         
+        thread_id = config["configurable"]["thread_id"]
+        store.put(report_namespace(thread_id), REPORT_KEY, {"content": response.content})
+        
         return {
-            "final_report": response.content,
+            "report_ref": REPORT_KEY,
             "error": None
         }
         
     except Exception as e:
-        print(f"❌ Writer Error: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("❌ Writer Error (%s): %s", state['ticker'], e)
         return {"error": "writing_failed"}
@@ -0,0 +1,49 @@
+"""
+Graph Run Helpers
+
+Shared by both entry points (main.py CLI, server.py HTTP): where checkpoints
+live and how one streaming turn of the graph is driven. Importing this
+module has no side effects (no .env loading or logging setup); that stays
+with the entry points.
+"""
+
+import logging
+import os
+
+from src.graph import WRITER
+
+logger = logging.getLogger(__name__)
+
+
+def checkpoint_db() -> str:
+    """
+    Checkpoint SQLite path, overridable via CHECKPOINT_DB.
+
+    Read per call, so the entry point's load_dotenv() applies regardless of
+    import order.
+    """
+    return os.getenv("CHECKPOINT_DB", "checkpoints.db")
+
+
+async def stream_once(app, graph_input, config):
+    """
+    Stream the graph until it pauses or finishes.
+
+    Interrupts and the writer's report reference are read straight from the
+    stream events, so no extra `get_state()` checkpoint read is needed per turn.
+
+    Returns:
+        tuple: (interrupts, report_ref) - interrupts is empty when the run finished
+    """
+    interrupts = ()
+    report_ref = None
+    # 只接收每個節點的增量更新，而非每步完整狀態
+    async for event in app.astream(graph_input, config=config, stream_mode="updates"):
+        for node_name, node_output in event.items():
+            if node_name == "__interrupt__":
+                interrupts = node_output
+                continue
+            logger.info("   ✓ %s 完成", node_name)
+            if node_name == WRITER and node_output:
+                report_ref = node_output.get("report_ref")
+    return interrupts, report_ref
@@ -25,7 +25,7 @@ class AgentState(TypedDict):
         financial_data: Extracted financial data (Pydantic object)
         valuation_metrics: Calculated valuation metrics (Pydantic object)
         qualitative_analysis: Qualitative analysis text
-        final_report: Final generated report in Markdown format
+        report_ref: Store key of the final Markdown report (body lives in the Store)
         error: Error control flag for exception handling
     """
     ticker: str
@@ -39,7 +39,7 @@ class AgentState(TypedDict):
     
     # 其他節點暫時用簡單類型
     qualitative_analysis: Optional[QualitativeAnalysis]  # [Update] 使用強類型
-    final_report: Optional[str]
+    report_ref: Optional[str]  # 報告正文存於 Store，state 只保留引用
     
     # --- [New] 調查任務隊列 ---
     # 用於存儲上游節點發現的異常，指導 Researcher 進行定向搜索